@@ -0,0 +1,248 @@
+import argparse
+import datetime
+import time
+
+import numpy as np
+
+from main import BookstoreManager
+from pricing import PricingEngine, ShippingTable
+from storage import open_store
+
+# Revenue and shipping analytics over BookstoreManager.bills.
+#
+# The bills are copied once into flat NumPy columns (cost, delivery charge,
+# delivery day, item and client codes); every aggregate after that is a
+# bincount/argpartition over those arrays rather than a Python loop. Needs
+# NumPy, which the rest of the app does not.
+#
+#   python analytics.py [--db store.db | store_dir/] [--start 2025-01-01] [--end 2025-01-31]
+#                       [--shipping-rates rates.json]
+#   python analytics.py --bench 1000000
+
+class BillColumns:
+    def __init__(self, cost, delivery_charge, day, item_index, client_index, titles, writers,
+                 item_title, item_writer, client_names):
+        self.cost = cost  # float64 per bill
+        self.delivery_charge = delivery_charge  # float64 per bill
+        self.day = day  # int32 proleptic ordinal of the delivery date
+        self.item_index = item_index  # int32 code into item_title / item_writer
+        self.client_index = client_index  # int32 code into client_names
+        self.titles = titles  # distinct titles, indexed by item_title codes
+        self.writers = writers  # distinct writers, indexed by item_writer codes
+        self.item_title = item_title  # item code -> title code
+        self.item_writer = item_writer  # item code -> writer code
+        self.client_names = client_names  # client code -> full name
+
+    def __len__(self):
+        return len(self.cost)
+
+    @property
+    def total(self):
+        return self.cost + self.delivery_charge
+
+    def select(self, mask):
+        return BillColumns(self.cost[mask], self.delivery_charge[mask], self.day[mask], self.item_index[mask],
+                           self.client_index[mask], self.titles, self.writers, self.item_title,
+                           self.item_writer, self.client_names)
+
+    def between(self, start: datetime.date = None, end: datetime.date = None):
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.day >= start.toordinal()
+        if end is not None:
+            mask &= self.day <= end.toordinal()
+        return self.select(mask)
+
+def build_columns(bills):
+    # The only per-bill Python loop: collect raw fields and assign dense codes
+    # to distinct items, titles, writers and clients.
+    item_codes, client_codes = {}, {}  # id(object) -> code
+    item_keys, client_keys = {}, {}  # value key -> code, for backends that do not intern
+    title_codes, writer_codes = {}, {}
+    item_title, item_writer, client_names = [], [], []
+    cost, charge, day, item_index, client_index = [], [], [], [], []
+
+    for bill in bills:
+        item = bill.inventory
+        code = item_codes.get(id(item))
+        if code is None:
+            key = (item.title, item.writer, item.cost)
+            code = item_keys.get(key)
+            if code is None:
+                code = item_keys[key] = len(item_title)
+                item_title.append(title_codes.setdefault(item.title, len(title_codes)))
+                item_writer.append(writer_codes.setdefault(item.writer, len(writer_codes)))
+            item_codes[id(item)] = code
+        item_index.append(code)
+
+        client = bill.delivery.purchase.client
+        code = client_codes.get(id(client))
+        if code is None:
+            key = (client.full_name, client.contact, client.email_address)
+            code = client_keys.get(key)
+            if code is None:
+                code = client_keys[key] = len(client_names)
+                client_names.append(client.full_name)
+            client_codes[id(client)] = code
+        client_index.append(code)
+
+        cost.append(item.cost)
+        charge.append(bill.delivery.delivery_charge)
+        day.append(bill.delivery.delivery_date.toordinal())
+
+    return BillColumns(
+        np.array(cost, dtype=np.float64),
+        np.array(charge, dtype=np.float64),
+        np.array(day, dtype=np.int32),
+        np.array(item_index, dtype=np.int32),
+        np.array(client_index, dtype=np.int32),
+        list(title_codes),
+        list(writer_codes),
+        np.array(item_title, dtype=np.int32),
+        np.array(item_writer, dtype=np.int32),
+        client_names,
+    )
+
+def revenue_per_day(columns: BillColumns):
+    if not len(columns):
+        return {}
+    first = int(columns.day.min())
+    offsets = columns.day - first
+    revenue = np.bincount(offsets, weights=columns.total)
+    counts = np.bincount(offsets)
+    return {
+        datetime.date.fromordinal(first + int(offset)): float(revenue[offset])
+        for offset in np.flatnonzero(counts)
+    }
+
+def _revenue_by_code(codes, total, names):
+    revenue = np.bincount(codes, weights=total, minlength=len(names))
+    present = np.bincount(codes, minlength=len(names)) > 0
+    order = np.argsort(-revenue, kind="stable")
+    return {names[code]: float(revenue[code]) for code in order if present[code]}
+
+def revenue_per_writer(columns: BillColumns):
+    return _revenue_by_code(columns.item_writer[columns.item_index], columns.total, columns.writers)
+
+def revenue_per_title(columns: BillColumns):
+    return _revenue_by_code(columns.item_title[columns.item_index], columns.total, columns.titles)
+
+def shipping_mix(columns: BillColumns, table: ShippingTable = None):
+    # Bills are classified by the charge applied, against the rates of the
+    # shipping table in use; 0.0 means no shipping method yet. Methods sharing
+    # a rate cannot be told apart, so the bills go to the first of them.
+    table = table or ShippingTable()
+    charge = columns.delivery_charge
+    classified = charge == 0.0
+    classes = {}
+    for method, rate in table.rates.items():
+        classes[method] = (charge == rate) & ~classified
+        classified |= classes[method]
+    classes["unshipped"] = charge == 0.0
+    classes["other"] = ~classified
+    total = columns.total
+    return {
+        name: {"bills": int(mask.sum()), "shipping_revenue": float(charge[mask].sum()),
+               "revenue": float(total[mask].sum())}
+        for name, mask in classes.items()
+    }
+
+def top_clients(columns: BillColumns, top: int = 10):
+    if not len(columns):
+        return []
+    revenue = np.bincount(columns.client_index, weights=columns.total, minlength=len(columns.client_names))
+    bill_counts = np.bincount(columns.client_index, minlength=len(columns.client_names))
+    k = min(top, int(np.count_nonzero(bill_counts)))
+    if k == 0:
+        return []
+    best = np.argpartition(-revenue, k - 1)[:k]
+    best = best[np.argsort(-revenue[best], kind="stable")]
+    return [
+        {"client": columns.client_names[code], "bills": int(bill_counts[code]), "revenue": float(revenue[code])}
+        for code in best
+    ]
+
+def daily_report(columns: BillColumns, start: datetime.date = None, end: datetime.date = None, top: int = 10,
+                 table: ShippingTable = None):
+    if start is not None or end is not None:
+        columns = columns.between(start, end)
+    return {
+        "bills": len(columns),
+        "revenue": float(columns.total.sum()),
+        "revenue_per_day": revenue_per_day(columns),
+        "revenue_per_writer": revenue_per_writer(columns),
+        "revenue_per_title": revenue_per_title(columns),
+        "shipping_mix": shipping_mix(columns, table),
+        "top_clients": top_clients(columns, top),
+    }
+
+def synthetic_columns(bills: int, titles: int = 50000, writers: int = 5000, clients: int = 100000, seed: int = 0,
+                      table: ShippingTable = None):
+    # Random columns of the same shape build_columns produces, for timing the
+    # aggregates without building a store first
+    rng = np.random.default_rng(seed)
+    rates = [0.0] + list((table or ShippingTable()).rates.values())
+    first_day = datetime.date(2021, 1, 1).toordinal()
+    return BillColumns(
+        rng.uniform(5, 120, bills).round(2),
+        rng.choice(rates, bills),
+        (first_day + rng.integers(0, 1500, bills)).astype(np.int32),
+        rng.integers(0, titles, bills, dtype=np.int32),
+        rng.integers(0, clients, bills, dtype=np.int32),
+        [f"book {i}" for i in range(titles)],
+        [f"writer {i}" for i in range(writers)],
+        np.arange(titles, dtype=np.int32),
+        rng.integers(0, writers, titles, dtype=np.int32),
+        [f"client {i}" for i in range(clients)],
+    )
+
+def print_report(report: dict, top: int):
+    print(f"Bills: {report['bills']}  Revenue: {report['revenue']:.2f}")
+    print("\nRevenue per day (latest first):")
+    for day, revenue in sorted(report["revenue_per_day"].items(), reverse=True)[:top]:
+        print(f"  {day}  {revenue:12.2f}")
+    for label, key in (("writer", "revenue_per_writer"), ("title", "revenue_per_title")):
+        print(f"\nTop revenue per {label}:")
+        for name, revenue in list(report[key].items())[:top]:
+            print(f"  {name:<40} {revenue:12.2f}")
+    print("\nShipping mix:")
+    for name, mix in report["shipping_mix"].items():
+        print(f"  {name:<10} {mix['bills']:>10} bills  {mix['shipping_revenue']:12.2f} shipping")
+    print("\nTop clients:")
+    for entry in report["top_clients"]:
+        print(f"  {entry['client']:<40} {entry['bills']:>6} bills  {entry['revenue']:12.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revenue and shipping analytics")
+    parser.add_argument("--db",
+                        help="SQLite file, sharded store directory or .json snapshot to read instead of store_data.json")
+    parser.add_argument("--start", type=datetime.date.fromisoformat)
+    parser.add_argument("--end", type=datetime.date.fromisoformat)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--shipping-rates", metavar="JSON", help="shipping table to use instead of the built-in rates")
+    parser.add_argument("--bench", type=int, metavar="BILLS",
+                        help="time the aggregates over this many synthetic bills instead")
+    args = parser.parse_args(argv)
+    table = ShippingTable.from_file(args.shipping_rates) if args.shipping_rates else None
+
+    if args.bench:
+        columns = synthetic_columns(args.bench, table=table)
+        start = time.perf_counter()
+        daily_report(columns, top=args.top, table=table)
+        print(f"daily_report over {args.bench} bills: {(time.perf_counter() - start) * 1000:.1f} ms")
+        return
+
+    manager = BookstoreManager(open_store(args.db) if args.db else None, pricing=PricingEngine(table))
+    try:
+        start = time.perf_counter()
+        columns = build_columns(manager.bills)
+        built = time.perf_counter()
+        report = daily_report(columns, args.start, args.end, args.top, manager.pricing.table)
+        done = time.perf_counter()
+    finally:
+        manager.close()
+    print_report(report, args.top)
+    print(f"\nColumns built in {(built - start) * 1000:.1f} ms, report in {(done - built) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
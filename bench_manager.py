@@ -0,0 +1,189 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from main import BookstoreManager
+from profile_load import build_store_data
+
+# Benchmarks for the BookstoreManager hot paths as the store grows.
+#
+#   python bench_manager.py --sizes 1000 10000 100000 1000000 --output bench_results.json
+#   python bench_manager.py --sizes 1000 10000 --compare bench_results.json
+#
+# Each size runs in a fresh interpreter, inside its own temp directory,
+# against a synthetic store with that many clients, items, purchases and bills.
+# Single-shot operations (load, save, text export) are timed once; lookups and
+# mutations are timed call by call over --samples random IDs. --compare exits
+# non-zero when an operation got slower than --threshold against a saved run.
+
+POINT_OPERATIONS = ("locate_bill", "locate_purchase", "generate_bill", "integrate_shipping", "delete_order_by_id")
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((peak if sys.platform == "darwin" else peak * 1024) / 2**20, 1)
+
+def percentile(sorted_values: list, fraction: float):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def summarize(latencies: list):
+    # latencies in seconds, one per call
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "seconds": round(total, 6),
+        "ops_per_sec": round(len(latencies) / total, 1) if total else None,
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 2),
+        "p90_us": round(percentile(latencies, 0.90) * 1e6, 2),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 2),
+        "max_us": round(latencies[-1] * 1e6, 2),
+    }
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def run_size(size: int, samples: int, seed: int = 0):
+    # Runs in the child process, with the temp directory as cwd
+    store_data = build_store_data(size, clients=size, items=size, seed=seed)
+    with open("store_data.json", "w") as f:
+        json.dump(store_data, f)
+    order_ids = list(store_data["purchases"])
+    bill_ids = [bill["bill_id"] for bill in store_data["bills"]]
+    del store_data
+    rng = random.Random(seed)
+    samples = min(samples, size)
+    result = {"size": size, "samples": samples, "store_bytes": os.path.getsize("store_data.json"), "operations": {}}
+    operations = result["operations"]
+
+    # The manager reports each lookup on stdout; only the timings matter here
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        manager = BookstoreManager()
+        operations["load_store_data"] = summarize([timed(manager.load_store_data)])
+        result["peak_rss_mb_after_load"] = peak_rss_mb()
+
+        calls = {
+            "locate_bill": [(manager.locate_bill, bill_id) for bill_id in rng.sample(bill_ids, samples)],
+            "locate_purchase": [(manager.locate_purchase, order_id) for order_id in rng.sample(order_ids, samples)],
+            "generate_bill": [(manager.generate_bill, order_id) for order_id in rng.sample(order_ids, samples)],
+        }
+        for name, batch in calls.items():
+            operations[name] = summarize([timed(fn, arg) for fn, arg in batch])
+
+        shipped = rng.sample(bill_ids, samples)
+        operations["integrate_shipping"] = summarize([
+            timed(manager.integrate_shipping, bill_id, "priority" if i % 2 else "standard")
+            for i, bill_id in enumerate(shipped)
+        ])
+        operations["delete_order_by_id"] = summarize([
+            timed(manager.delete_order_by_id, order_id) for order_id in rng.sample(order_ids, samples)
+        ])
+
+        operations["save_orders_to_text"] = summarize([timed(manager.save_orders_to_text)])
+        result["orders_text_bytes"] = os.path.getsize("student2_orders.txt")
+        operations["save_store_data"] = summarize([timed(manager.save_store_data)])
+        result["saved_store_bytes"] = os.path.getsize("store_data.json")
+        manager.close()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(current: dict, baseline: dict, threshold: float):
+    # Ratios of current to baseline time per call; above 1 + threshold is a regression
+    baseline_results = {result["size"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"\nAgainst {baseline['meta'].get('revision') or 'baseline'} ({baseline['meta']['timestamp']}):")
+    for result in current["results"]:
+        before = baseline_results.get(result["size"])
+        if before is None:
+            continue
+        for name, stats in result["operations"].items():
+            old = before["operations"].get(name)
+            if old is None:
+                continue
+            key = "seconds" if name not in POINT_OPERATIONS else "p50_us"
+            ratio = stats[key] / old[key] if old[key] else 1.0
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions.append((result["size"], name, ratio))
+            print(f"  {result['size']:>9} {name:<22} {ratio:>6.2f}x{flag}")
+    return regressions
+
+def print_results(report: dict):
+    for result in report["results"]:
+        print(f"\n{result['size']} records  ({result['store_bytes'] / 2**20:.1f} MB snapshot, "
+              f"peak RSS {result['peak_rss_mb']} MB)")
+        print(f"  {'operation':<22}{'calls':>7}{'ops/s':>12}{'p50 us':>10}{'p99 us':>10}{'max us':>12}")
+        for name, stats in result["operations"].items():
+            ops = f"{stats['ops_per_sec']:.0f}" if stats["ops_per_sec"] else "-"
+            print(f"  {name:<22}{stats['calls']:>7}{ops:>12}{stats['p50_us']:>10.1f}"
+                  f"{stats['p99_us']:>10.1f}{stats['max_us']:>12.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BookstoreManager operations across store sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=1000, help="timed calls per lookup or mutation")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier --output file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing --compare")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)  # Child process mode
+    args = parser.parse_args(argv)
+
+    if args.size:
+        print(json.dumps(run_size(args.size, args.samples)))
+        return 0
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "samples": args.samples,
+        },
+        "results": [],
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} records...", flush=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--size", str(size),
+                                  "--samples", str(args.samples)],
+                                 cwd=tmp, check=True, capture_output=True, text=True).stdout
+        report["results"].append(json.loads(out.strip().splitlines()[-1]))
+
+    print_results(report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
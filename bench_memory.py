@@ -0,0 +1,150 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+from profile_load import build_store_data
+from storage import JsonStore
+
+# Bytes retained per bill after loading a synthetic store, comparing the
+# original entity layout (plain classes, a private copy of every client, item
+# and order per bill) with the current one (__slots__, interned records).
+#
+#   python bench_memory.py --bills 1000000
+#
+# Each side loads its own file in a fresh interpreter under tracemalloc.
+
+# The entity classes and loader as they were before __slots__ and interning
+class _DictClient:
+    def __init__(self, full_name, contact, email_address):
+        self.full_name = full_name
+        self.contact = contact
+        self.email_address = email_address
+
+class _DictInventory:
+    def __init__(self, title, writer, cost):
+        self.title = title
+        self.writer = writer
+        self.cost = cost
+
+class _DictPurchase:
+    def __init__(self, client, inventory):
+        self.client = client
+        self.inventory = inventory
+        self.order_id = str(uuid.uuid4())
+
+class _DictDelivery:
+    def __init__(self, purchase, delivery_date):
+        self.purchase = purchase
+        self.delivery_date = delivery_date
+        self.delivery_charge = 0.0
+
+class _DictBill:
+    def __init__(self, bill_id, inventory, delivery):
+        self.bill_id = bill_id
+        self.inventory = inventory
+        self.delivery = delivery
+        self.total_amount = 0.0
+
+def _load_before(data_file):
+    clients, items, purchases, bills = [], [], [], []
+    with open(data_file) as f:
+        store_data = json.load(f)
+    for c in store_data["clients"]:
+        clients.append(_DictClient(c["full_name"], c["contact"], c["email_address"]))
+    for i in store_data["items"]:
+        items.append(_DictInventory(i["title"], i["writer"], i["cost"]))
+    for p in store_data["purchases"]:
+        purchase = _DictPurchase(_DictClient(**p["client"]), _DictInventory(**p["inventory"]))
+        purchase.order_id = p["order_id"]
+        purchases.append(purchase)
+    for b in store_data["bills"]:
+        p = b["delivery"]["purchase"]
+        item = _DictInventory(**p["inventory"])
+        purchase = _DictPurchase(_DictClient(**p["client"]), item)
+        purchase.order_id = p["order_id"]
+        delivery = _DictDelivery(purchase, datetime.date.fromisoformat(b["delivery"]["delivery_date"]))
+        delivery.delivery_charge = b["delivery"]["delivery_charge"]
+        bills.append(_DictBill(b["bill_id"], item, delivery))
+    return clients, items, purchases, bills
+
+def _load_after(data_file):
+    store = JsonStore(data_file, journal_file=os.devnull)
+    store.load()
+    return store
+
+def _to_v1(store_data):
+    # Expand the v2 references into the original nested layout
+    clients, items = store_data["clients"], store_data["items"]
+    orders = {
+        o["order_id"]: {"client": clients[o["client"]], "inventory": items[o["item"]], "order_id": o["order_id"]}
+        for o in store_data["orders"]
+    }
+    return {
+        "clients": clients,
+        "items": items,
+        "purchases": [orders[order_id] for order_id in store_data["purchases"]],
+        "bills": [
+            {
+                "bill_id": b["bill_id"],
+                "inventory": items[b["item"]],
+                "delivery": {
+                    "purchase": orders[b["order_id"]],
+                    "delivery_date": b["delivery_date"],
+                    "delivery_charge": b["delivery_charge"],
+                },
+            }
+            for b in store_data["bills"]
+        ],
+    }
+
+def measure(layout, data_file):
+    loader = _load_before if layout == "before" else _load_after
+    gc.collect()
+    tracemalloc.start()
+    loaded = loader(data_file)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del loaded
+    return retained
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory per bill before and after the compact entity model")
+    parser.add_argument("--bills", type=int, default=1000000)
+    parser.add_argument("--measure", nargs=2, metavar=("LAYOUT", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(measure(*args.measure))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_data = build_store_data(args.bills)
+        files = {"before": os.path.join(tmp, "v1.json"), "after": os.path.join(tmp, "v2.json")}
+        with open(files["after"], "w") as f:
+            json.dump(store_data, f)
+        with open(files["before"], "w") as f:
+            json.dump(_to_v1(store_data), f)
+        del store_data
+
+        results = {}
+        for layout, data_file in files.items():
+            out = subprocess.run([sys.executable, __file__, "--measure", layout, data_file],
+                                 check=True, capture_output=True, text=True).stdout
+            results[layout] = int(out.strip().splitlines()[-1])
+
+    print(f"{args.bills} bills")
+    print(f"{'layout':<8}{'total MB':>12}{'bytes/bill':>12}")
+    for layout, retained in results.items():
+        print(f"{layout:<8}{retained / 2**20:>12.1f}{retained / args.bills:>12.0f}")
+    print(f"saving: {1 - results['after'] / results['before']:.0%}")
+
+if __name__ == "__main__":
+    main()
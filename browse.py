@@ -0,0 +1,71 @@
+# Sorted, filtered snapshots of the bills for list views.
+#
+#   view = manager.browse_bills(sort="client", descending=True, field="title", text="dune")
+#   len(view)                   # matching bills
+#   manager.bill_rows(view, offset=5000, limit=25)
+#
+# A view is built once per sort or filter change and keeps only the order of
+# the matching bills; rows are formatted a page at a time, so scrolling a view
+# over a million bills costs the same as over a hundred. Views are snapshots:
+# bills added or deleted afterwards show up once the view is rebuilt.
+
+BILL_SORT_FIELDS = ("date", "client", "title")
+BILL_FILTER_FIELDS = ("client", "title", "date")
+# Display columns of the tuples returned by BillView.rows()
+BILL_COLUMNS = ("delivery_date", "client", "title", "total", "bill_id", "order_id")
+# Stands in for a bill deleted after the view was built, so rows keep their offsets
+MISSING_BILL_ROW = ("", "(deleted)", "", "", "", "")
+
+_SORT_KEYS = {
+    "date": lambda bill: bill.delivery.delivery_date,
+    "client": lambda bill: bill.delivery.purchase.client.full_name.casefold(),
+    "title": lambda bill: bill.inventory.title.casefold(),
+}
+_FILTER_VALUES = {
+    "client": lambda bill: bill.delivery.purchase.client.full_name.casefold(),
+    "title": lambda bill: bill.inventory.title.casefold(),
+    "date": lambda bill: bill.delivery.delivery_date.isoformat(),
+}
+
+def check_view_args(sort: str, field: str):
+    if sort not in BILL_SORT_FIELDS:
+        raise ValueError(f"cannot sort bills by {sort!r}; choose from {', '.join(BILL_SORT_FIELDS)}")
+    if field is not None and field not in BILL_FILTER_FIELDS:
+        raise ValueError(f"cannot filter bills by {field!r}; choose from {', '.join(BILL_FILTER_FIELDS)}")
+
+def bill_row(bill):
+    delivery = bill.delivery
+    return (delivery.delivery_date.isoformat(), delivery.purchase.client.full_name, bill.inventory.title,
+            f"{bill.inventory.cost + delivery.delivery_charge:.2f}", bill.bill_id, delivery.purchase.order_id)
+
+class BillView:
+    # keys are in display order; fetch turns a slice of them into a list of
+    # the same length holding a Bill, or None where the bill is gone
+    def __init__(self, keys: list, fetch=list):
+        self._keys = keys
+        self._fetch = fetch
+
+    def __len__(self):
+        return len(self._keys)
+
+    def rows(self, offset: int, limit: int):
+        return [MISSING_BILL_ROW if bill is None else bill_row(bill)
+                for bill in self._fetch(self._keys[max(offset, 0):offset + limit])]
+
+def memory_bill_view(bills, sort: str = "date", descending: bool = False, field: str = None, text: str = ""):
+    # For stores that hold every bill in memory: filter, then one stable sort
+    text = text.strip().casefold()
+    if field is not None and text:
+        value = _FILTER_VALUES[field]
+        if field == "date":
+            bills = [bill for bill in bills if value(bill).startswith(text)]  # "2025", "2025-01", ...
+        else:
+            bills = [bill for bill in bills if text in value(bill)]
+    else:
+        bills = list(bills)
+    bills.sort(key=_SORT_KEYS[sort], reverse=descending)
+    return BillView(bills)
+
+def ordered(keys: list, found: dict):
+    # Rows fetched by key, back in the order of keys, None for missing ones
+    return [found.get(key) for key in keys]
@@ -0,0 +1,163 @@
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+import time
+
+from storage import JsonStore, iter_store_dict, open_store
+
+# Order report exporter. Bills are streamed through a generator of plain
+# field tuples and written in large buffered blocks, in the original text
+# layout of student2_orders.txt or as CSV / JSON lines.
+#
+#   python exporter.py student2_orders.txt
+#   python exporter.py orders.csv --format csv --incremental [--db store.db | store_dir/]
+#   python exporter.py --bench 200000
+#
+# --incremental appends only the bills raised since the previous incremental
+# export of the same file, tracked in "<output>.cursor".
+
+EXPORT_FORMATS = ("text", "csv", "jsonl")
+EXPORT_BUFFER_SIZE = 1 << 20  # Bytes buffered by the output file
+EXPORT_BLOCK_ROWS = 1000  # Rows formatted per write call
+
+CSV_HEADER = ("bill_id", "client", "contact", "email", "title", "writer", "cost",
+              "delivery_date", "delivery_charge", "total")
+
+def iter_bill_rows(bills):
+    # One flat tuple per bill, read straight from the attributes
+    for bill in bills:
+        delivery = bill.delivery
+        client = delivery.purchase.client
+        item = bill.inventory
+        yield (bill.bill_id, client.full_name, client.contact, client.email_address, item.title, item.writer,
+               item.cost, delivery.delivery_date, delivery.delivery_charge, item.cost + delivery.delivery_charge)
+
+def _text_block(rows):
+    return "".join(
+        f"Bill ID: {bill_id}\n"
+        f"Client: {full_name}\n"
+        f"Contact: {contact}\n"
+        f"Email: {email_address}\n"
+        f"Book Title: {title}\n"
+        f"Writer: {writer}\n"
+        f"Cost: {cost}\n"
+        f"Delivery Date: {delivery_date}\n"
+        f"Delivery Charge: {delivery_charge}\n"
+        f"Total Amount: {total}\n"
+        f"\n"
+        for bill_id, full_name, contact, email_address, title, writer, cost, delivery_date, delivery_charge, total
+        in rows
+    )
+
+def _csv_block(rows):
+    out = io.StringIO()
+    csv.writer(out).writerows(rows)
+    return out.getvalue()
+
+def _jsonl_block(rows):
+    return "".join(
+        json.dumps(dict(zip(CSV_HEADER, row[:7] + (row[7].isoformat(),) + row[8:]))) + "\n"
+        for row in rows
+    )
+
+BLOCK_WRITERS = {"text": _text_block, "csv": _csv_block, "jsonl": _jsonl_block}
+
+def write_bills(bills, path: str, fmt: str = "text", append: bool = False):
+    # Returns (bills written, bytes written)
+    format_block = BLOCK_WRITERS[fmt]
+    count = 0
+    # The csv module writes its own line endings; text and JSON lines use the platform's
+    newline = "" if fmt == "csv" else None
+    with open(path, "a" if append else "w", buffering=EXPORT_BUFFER_SIZE, newline=newline) as f:
+        start = f.tell()
+        if fmt == "csv" and start == 0:
+            f.write(_csv_block([CSV_HEADER]))
+        block = []
+        for row in iter_bill_rows(bills):
+            block.append(row)
+            if len(block) == EXPORT_BLOCK_ROWS:
+                f.write(format_block(block))
+                count += len(block)
+                block = []
+        if block:
+            f.write(format_block(block))
+            count += len(block)
+        size = f.tell() - start
+    return count, size
+
+def export_bills(store, path: str, fmt: str = "text", incremental: bool = False):
+    # Full exports rewrite the file from store.bills. Incremental exports
+    # append the bills dated on or after the cursor day that were not already
+    # written, then move the cursor to the newest day written.
+    if not incremental:
+        return write_bills(store.bills, path, fmt)
+
+    cursor_file = path + ".cursor"
+    try:
+        with open(cursor_file, "r") as f:
+            cursor = json.load(f)
+        day = datetime.date.fromisoformat(cursor["day"])
+        exported = set(cursor["bill_ids"])
+    except FileNotFoundError:
+        day, exported = datetime.date.min, set()
+
+    new_bills = [bill for bill in store.bills_since(day) if bill.bill_id not in exported]
+    count, size = write_bills(new_bills, path, fmt, append=True)
+
+    if new_bills:
+        last_day = max(bill.delivery.delivery_date for bill in new_bills)
+        if last_day > day:
+            day, exported = last_day, set()
+        exported.update(bill.bill_id for bill in new_bills if bill.delivery.delivery_date == day)
+    tmp_file = cursor_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump({"day": day.isoformat(), "bill_ids": sorted(exported)}, f)
+    os.replace(tmp_file, cursor_file)
+    return count, size
+
+def bench(bills: int):
+    # Imported here: profile_load needs the Unix-only resource module, and
+    # the GUI, service and CLI import this module at startup
+    from profile_load import build_store_data
+    store = JsonStore(journal_file=os.devnull)
+    store._load_records(iter_store_dict(build_store_data(bills)))
+    all_bills = store.bills
+    print(f"{'format':<8}{'seconds':>10}{'MB/s':>10}{'bills/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in EXPORT_FORMATS:
+            start = time.perf_counter()
+            count, size = write_bills(all_bills, os.path.join(tmp, f"orders.{fmt}"), fmt)
+            elapsed = time.perf_counter() - start
+            print(f"{fmt:<8}{elapsed:>10.3f}{size / 2**20 / elapsed:>10.1f}{count / elapsed:>12.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export bills as text, CSV or JSON lines")
+    parser.add_argument("output", nargs="?", default="student2_orders.txt")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="text")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the bills raised since the last incremental export")
+    parser.add_argument("--db",
+                        help="SQLite file, sharded store directory or .json snapshot to read instead of store_data.json")
+    parser.add_argument("--bench", type=int, metavar="BILLS", help="measure export throughput instead")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.bench)
+        return
+
+    store = open_store(args.db)
+    store.load()
+    try:
+        start = time.perf_counter()
+        count, size = export_bills(store, args.output, args.format, args.incremental)
+        elapsed = time.perf_counter() - start
+    finally:
+        store.close()
+    print(f"Exported {count} bills to {args.output} ({size / 2**20:.1f} MB) in {elapsed:.3f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from main import BookstoreManager
+from models import Client, Inventory
+from storage import open_store
+from validation import COLUMNS, validate_rows
+
+# Bulk import of clients or inventory from CSV.
+#
+#   python importer.py clients customers.csv [--store store_dir/] [--rejects rejected.csv]
+#   python importer.py inventory catalog.csv --workers 8
+#   python importer.py clients big.csv --generate 5000000   # write a synthetic file first
+#
+# The file is streamed in chunks that a process pool parses and validates
+# (validation.validate_rows); the parent keeps at most two chunks per worker
+# in flight, drops duplicates (clients by email, items by title and writer,
+# against the file so far and the store) and inserts what is left in batches.
+# Columns are matched by header name: full_name, contact, email_address or
+# title, writer, cost.
+
+IMPORT_CHUNK_ROWS = 20000  # Rows per validation task
+IMPORT_BATCH_SIZE = 50000  # Records per manager insert
+
+def iter_chunks(path: str, kind: str, chunk_rows: int = IMPORT_CHUNK_ROWS):
+    # Yields the column positions first, then (first row number, rows) chunks.
+    # Row numbers count the header as row 1, as spreadsheets do.
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        missing = [name for name in COLUMNS[kind] if name not in header]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        yield tuple(header.index(name) for name in COLUMNS[kind])
+        first_row, chunk = 2, []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                yield first_row, chunk
+                first_row += len(chunk)
+                chunk = []
+        if chunk:
+            yield first_row, chunk
+
+def validated_chunks(path: str, kind: str, workers: int):
+    chunks = iter_chunks(path, kind)
+    positions = next(chunks)
+    if workers == 0:
+        for first_row, rows in chunks:
+            yield validate_rows(kind, first_row, rows, positions)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for first_row, rows in chunks:
+            pending.append(pool.submit(validate_rows, kind, first_row, rows, positions))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def dedupe_key(kind: str, fields: tuple):
+    if kind == "clients":
+        return fields[2].lower()  # email_address
+    return fields[0].casefold(), fields[1].casefold()  # title, writer
+
+def import_csv(manager: BookstoreManager, kind: str, path: str, workers: int = None, rejects_file: str = None,
+               batch_size: int = IMPORT_BATCH_SIZE, progress=None):
+    workers = os.cpu_count() if workers is None else workers
+    entity, insert = (Client, manager.add_clients) if kind == "clients" else (Inventory, manager.add_inventory_items)
+    if kind == "clients":
+        seen = {client.email_address.lower() for client in manager.clients}
+    else:
+        seen = {(item.title.casefold(), item.writer.casefold()) for item in manager.items}
+
+    report = {"rows": 0, "imported": 0, "duplicates": 0, "rejected": 0, "reasons": Counter()}
+    rejects_out = open(rejects_file, "w", newline="") if rejects_file else None
+    rejects = csv.writer(rejects_out) if rejects_out else None
+    if rejects:
+        rejects.writerow(["row", "reason", "data"])
+    batch = []
+    start = time.perf_counter()
+    try:
+        for accepted, rejected in validated_chunks(path, kind, workers):
+            report["rows"] += len(accepted) + len(rejected)
+            for number, fields in accepted:
+                key = dedupe_key(kind, fields)
+                if key in seen:
+                    report["duplicates"] += 1
+                    rejected.append((number, "duplicate", list(fields)))
+                    continue
+                seen.add(key)
+                batch.append(entity(*fields))
+            for number, reason, row in rejected:
+                if reason != "duplicate":
+                    report["rejected"] += 1
+                    report["reasons"][reason.split(" ", 1)[0]] += 1
+                if rejects:
+                    rejects.writerow([number, reason, *row])
+            if len(batch) >= batch_size:
+                insert(batch)
+                report["imported"] += len(batch)
+                batch = []
+            if progress:
+                progress(report, time.perf_counter() - start)
+        if batch:
+            insert(batch)
+            report["imported"] += len(batch)
+    finally:
+        if rejects_out:
+            rejects_out.close()
+    report["seconds"] = time.perf_counter() - start
+    report["rows_per_second"] = report["rows"] / report["seconds"] if report["seconds"] else 0.0
+    return report
+
+def generate_csv(path: str, kind: str, rows: int, seed: int = 0):
+    # Synthetic input with about 1% malformed rows and 1% repeated records
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS[kind])
+        for i in range(rows):
+            n = rng.randrange(i) if i and rng.random() < 0.01 else i
+            if kind == "clients":
+                row = [f"Client {n}", f"+1 555 {n % 10000000:07d}", f"client{n}@example.com"]
+            else:
+                row = [f"Book {n}", f"Writer {n % 5000}", f"{5 + n % 11500 / 100:.2f}"]
+            if rng.random() < 0.01:
+                row[rng.randrange(3)] = rng.choice(("", "n/a", "-1"))
+            writer.writerow(row)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import clients or inventory from CSV")
+    parser.add_argument("kind", choices=COLUMNS)
+    parser.add_argument("csv_file")
+    parser.add_argument("--store", help="SQLite file, sharded store directory or .json snapshot instead of store_data.json")
+    parser.add_argument("--workers", type=int, help="validation processes (default: CPU count, 0 = in-process)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--rejects", help="write rejected and duplicate rows here as CSV")
+    parser.add_argument("--generate", type=int, metavar="ROWS", help="first write a synthetic csv_file of this size")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_csv(args.csv_file, args.kind, args.generate)
+        print(f"Wrote {args.generate} rows to {args.csv_file}", file=sys.stderr)
+
+    def progress(report, elapsed):
+        if report["rows"] % 1000000 < IMPORT_CHUNK_ROWS:
+            print(f"  {report['rows']} rows, {report['rows'] / elapsed:.0f} rows/s", file=sys.stderr)
+
+    manager = BookstoreManager(open_store(args.store))
+    try:
+        report = import_csv(manager, args.kind, args.csv_file, args.workers, args.rejects, args.batch_size, progress)
+        manager.save_store_data()  # Fold the import into the snapshot rather than the journal
+    finally:
+        manager.close()
+
+    print(f"{report['rows']} rows in {report['seconds']:.2f} s ({report['rows_per_second']:.0f} rows/s)")
+    print(f"  imported   {report['imported']}")
+    print(f"  duplicates {report['duplicates']}")
+    print(f"  rejected   {report['rejected']}")
+    for reason, count in report["reasons"].most_common():
+        print(f"    {reason:<12} {count}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# Load generator for service.py. Each thread keeps one connection open and
+# loops through the order flow: purchase, bill, shipping, lookup and, for
+# every fourth order, deletion.
+#
+#   python service.py --port 8080 &
+#   python loadgen.py --port 8080 --threads 16 --seconds 10
+#   python loadgen.py --spawn --threads 16   # start a throwaway local instance
+
+def percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+class Session:
+    def __init__(self, host: str, port: int):
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.latencies = {}  # operation -> [seconds]
+        self.errors = 0
+
+    def call(self, operation: str, method: str, path: str, body: dict = None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data else {}
+        start = time.perf_counter()
+        self.conn.request(method, path, body=data, headers=headers)
+        response = self.conn.getresponse()
+        payload = json.loads(response.read())
+        self.latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        if response.status >= 400:
+            self.errors += 1
+            return None
+        return payload
+
+    def order_flow(self, client: str, title: str, step: int):
+        order = self.call("add-purchase", "POST", "/purchases", {"client": client, "title": title})
+        if order is None:
+            return
+        bill = self.call("generate-bill", "POST", "/bills", {"order_id": order["order_id"]})
+        if bill is None:
+            return
+        method = "priority" if step % 2 else "standard"
+        self.call("apply-shipping", "POST", f"/bills/{bill['bill_id']}/shipping", {"method": method})
+        self.call("locate-bill", "GET", f"/bills/{bill['bill_id']}")
+        if step % 4 == 0:
+            self.call("delete-order", "DELETE", f"/orders/{order['order_id']}")
+
+def seed(host: str, port: int, run_id: str, clients: int, titles: int):
+    session = Session(host, port)
+    for i in range(clients):
+        session.call("add-client", "POST", "/clients",
+                     {"full_name": f"load {run_id} client {i}", "contact": f"{i:010d}",
+                      "email_address": f"load{i}@example.com"})
+    for i in range(titles):
+        session.call("add-inventory", "POST", "/inventory",
+                     {"title": f"load {run_id} book {i}", "writer": f"writer {i % 50}", "cost": 10 + i % 90})
+    session.conn.close()
+    return session
+
+def run(host: str, port: int, threads: int, seconds: float, clients: int = 100, titles: int = 500):
+    run_id = uuid.uuid4().hex[:8]
+    seeded = seed(host, port, run_id, clients, titles)
+    sessions = [Session(host, port) for _ in range(threads)]
+    deadline = time.perf_counter() + seconds
+
+    def worker(index: int, session: Session):
+        step = index
+        while time.perf_counter() < deadline:
+            session.order_flow(f"load {run_id} client {step % clients}", f"load {run_id} book {step % titles}", step)
+            step += threads
+        session.conn.close()
+
+    workers = [threading.Thread(target=worker, args=(i, session)) for i, session in enumerate(sessions)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    by_operation = {}
+    for session in sessions:
+        for operation, latencies in session.latencies.items():
+            by_operation.setdefault(operation, []).extend(latencies)
+    all_latencies = sorted(latency for latencies in by_operation.values() for latency in latencies)
+    summary = {
+        "threads": threads,
+        "seconds": round(elapsed, 3),
+        "requests": len(all_latencies),
+        "errors": sum(session.errors for session in sessions) + seeded.errors,
+        "requests_per_second": round(len(all_latencies) / elapsed, 1),
+        "p50_ms": round(percentile(all_latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(all_latencies, 0.99) * 1000, 3),
+        "operations": {},
+    }
+    for operation, latencies in sorted(by_operation.items()):
+        latencies.sort()
+        summary["operations"][operation] = {
+            "requests": len(latencies),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }
+    return summary
+
+def print_summary(summary: dict):
+    print(f"{summary['requests']} requests from {summary['threads']} threads in {summary['seconds']} s "
+          f"({summary['errors']} errors)")
+    print(f"{summary['requests_per_second']} req/s  p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms")
+    print(f"\n{'operation':<16}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for operation, stats in summary["operations"].items():
+        print(f"{operation:<16}{stats['requests']:>10}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+def spawn_service(port: int, workdir: str, timeout: float = 30):
+    service = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "service.py"), "--port", str(port)],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Wait until the store is loaded and the port answers
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/inventory")
+            conn.getresponse().read()
+            conn.close()
+            return service
+        except OSError:
+            if service.poll() is not None or time.perf_counter() > deadline:
+                service.kill()
+                raise RuntimeError("service.py did not start")
+            time.sleep(0.1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive service.py with concurrent order flows")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--spawn", action="store_true", help="start a service with an empty store in a temp dir")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = spawn_service(args.port, tmp) if args.spawn else None
+        try:
+            summary = run(args.host, args.port, args.threads, args.seconds)
+        finally:
+            if service is not None:
+                service.send_signal(signal.SIGINT)
+                service.wait()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+if __name__ == "__main__":
+    main()
@@ -1,333 +1,654 @@
+import time
+
+STARTED = time.perf_counter()  # Origin for --startup-timing
+
+import argparse
 import datetime
-import tkinter as tk
-from tkinter import messagebox, ttk
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import json  # JSON support
+import sys
+import threading
 import uuid  # For generating unique order IDs
 
-# Core entities
-class Client:
-    def __init__(self, full_name: str, contact: str, email_address: str):
-        self.full_name = full_name
-        self.contact = contact
-        self.email_address = email_address
+from browse import BILL_COLUMNS, BILL_FILTER_FIELDS, MISSING_BILL_ROW, check_view_args
+from exporter import EXPORT_FORMATS, export_bills, write_bills
+from locks import AtomicCounter, RWLock
+from metrics import Metrics, instrument
+from models import Client, Inventory, Purchase, Delivery, Bill
+from pricing import PricingEngine
+from search import InventoryIndex
+from validation import validate_client, validate_item
+from storage import StoreBackend, JsonStore, open_store
 
-    @property
-    def get_full_name(self):
-        return self.full_name
+IMPORTED = time.perf_counter()
 
-    @property
-    def get_contact(self):
-        return self.contact
+# tkinter is imported when the GUI starts (import_tk), so scripts and services
+# that only need BookstoreManager never load Tk
+tk = filedialog = messagebox = ttk = None
 
-    @property
-    def get_email_address(self):
-        return self.email_address
-
-class Inventory:
-    def __init__(self, title: str, writer: str, cost: float):
-        self.title = title
-        self.writer = writer
-        self.cost = cost
+def import_tk():
+    global tk, filedialog, messagebox, ttk
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
 
-    @property
-    def get_title(self):
-        return self.title
-
-    @property
-    def get_writer(self):
-        return self.writer
+class BookstoreManager:
+    # Safe to share between threads: lookups hold the read side of self.lock,
+    # mutations, loads and saves the write side. Public methods that call
+    # each other only nest inside writes, which the lock allows.
+    #
+    # Saved data is read on first use of self.store rather than here, so
+    # building a manager costs nothing; call load_store_data() to load up front.
+    def __init__(self, store: StoreBackend = None, metrics: Metrics = None, pricing: PricingEngine = None):
+        # JSON snapshot + journal by default; pass SQLiteStore() for a database
+        self._store = store if store is not None else JsonStore()
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self.metrics = metrics
+        self.pricing = pricing if pricing is not None else PricingEngine()  # Shipping rates and cached totals
+        self.lock = RWLock()
+        self.urgent_shipments = AtomicCounter()  # Priority shipments applied through this manager
+        self._item_index = None  # Title/writer search index, built on first search
+        self._item_index_lock = threading.Lock()
+        if metrics is not None:
+            instrument(self, metrics, self._store)
 
     @property
-    def get_cost(self):
-        return self.cost
-
-class Purchase:
-    def __init__(self, client: Client, inventory: Inventory):
-        self.client = client
-        self.inventory = inventory
-        self.order_id = str(uuid.uuid4())  # Generate a unique order ID
-
+    def store(self):
+        if not self._loaded:
+            self._load_on_first_use()
+        return self._store
+
+    def _load_on_first_use(self):
+        # Not under self.lock: the first use may come from inside a read,
+        # which cannot be upgraded to the write side load_store_data takes
+        with self._load_lock:
+            if self._loaded:
+                return
+            start = time.perf_counter()
+            self._store.load()
+            self._loaded = True
+        if self.metrics is not None:
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("load_store_data", elapsed)
+            self.metrics.observe_store_io("load_store_data", elapsed, self._store.stored_bytes())
+
+    # Collections are returned as snapshot lists, safe to iterate while
+    # other threads keep mutating the store
     @property
-    def get_client(self):
-        return self.client
+    def clients(self):
+        with self.lock.read():
+            return list(self.store.clients)
 
     @property
-    def get_inventory(self):
-        return self.inventory
+    def items(self):
+        with self.lock.read():
+            return list(self.store.items)
 
     @property
-    def get_order_id(self):
-        return self.order_id
-
-class Delivery:
-    urgent_shipments = 0
-
-    def __init__(self, purchase: Purchase, delivery_date: datetime.date):
-        self.purchase = purchase
-        self.delivery_date = delivery_date
-        self.delivery_charge = 0.0
+    def purchases(self):
+        with self.lock.read():
+            return list(self.store.purchases)
 
     @property
-    def get_delivery_date(self):
-        return self.delivery_date
+    def bills(self):
+        with self.lock.read():
+            return list(self.store.bills)
 
     @property
-    def get_delivery_charge(self):
-        return self.delivery_charge
-
-    def update_delivery_charge(self, charge: float):
-        self.delivery_charge = charge
-
-    def calculate_delivery_charge(self, priority: bool):
-        if priority:
-            self.delivery_charge = 6.50
-            Delivery.urgent_shipments += 1
-        else:
-            self.delivery_charge = 4.20
-        return self.delivery_charge
+    def all_bills(self):
+        return self.bills
 
-class Bill:
-    def __init__(self, bill_id: str, inventory: Inventory, delivery: Delivery):
-        self.bill_id = bill_id
-        self.inventory = inventory
-        self.delivery = delivery
-        self.total_amount = 0.0
+    def add_client(self, client: Client):
+        with self.lock.write():
+            return self.store.add_client(client)
+
+    def add_inventory(self, item: Inventory):
+        with self.lock.write():
+            item = self.store.add_item(item)
+            if self._item_index is not None:
+                self._item_index.add(item)
+            return item
+
+    def add_purchase(self, purchase: Purchase):
+        with self.lock.write():
+            return self.store.add_purchase(purchase)
+
+    # Bulk variants for imports: one lock acquisition and one journal write per batch
+    def add_clients(self, clients):
+        with self.lock.write():
+            return self.store.add_clients(clients)
+
+    def add_inventory_items(self, items):
+        with self.lock.write():
+            items = self.store.add_items(items)
+            if self._item_index is not None:
+                for item in items:
+                    self._item_index.add(item)
+            return items
+
+    def update_inventory_cost(self, title: str, cost: float):
+        # Reprices the item; only the cached totals of its bills are recomputed
+        with self.lock.write():
+            item = self.store.find_item(title)
+            if item:
+                old_cost = item.cost
+                item = self.store.update_item_cost(item, cost)
+                self.pricing.cost_changed(old_cost, item, self.store.get_bills)
+                if self._item_index is not None:
+                    self._item_index.repriced(old_cost, item)
+            return item
+
+    def find_client(self, full_name: str):
+        with self.lock.read():
+            return self.store.find_client(full_name)
+
+    def find_item(self, title: str):
+        with self.lock.read():
+            return self.store.find_item(title)
 
     @property
-    def get_bill_id(self):
-        return self.bill_id
-
-    def calculate_total(self):
-        self.total_amount = self.inventory.get_cost + self.delivery.get_delivery_charge
-        return self.total_amount
-
-class BookstoreManager:
-    def __init__(self):
-        self.clients = []
-        self.items = []
-        self.purchases = []
-        self.bills = []
-        self.load_store_data()  # Load saved data
-
-    @property
-    def all_bills(self):
-        return self.bills
+    def item_index(self):
+        # Built once, by whichever reader gets here first
+        with self._item_index_lock:
+            if self._item_index is None:
+                self._item_index = InventoryIndex(self.store.items)
+            return self._item_index
+
+    def search_items(self, query: str, limit: int = 10):
+        # Type-ahead: title and writer prefixes, then typo-tolerant matches
+        with self.lock.read():
+            return self.item_index.search(query, limit)
+
+    def resolve_item(self, title: str):
+        # Exact title first, then the same title ignoring case and spacing
+        with self.lock.read():
+            return self.store.find_item(title) or self.item_index.match_title(title)
+
+    def get_bill(self, bill_id: str):
+        # locate_bill without the console output, for the service
+        with self.lock.read():
+            return self.store.get_bill(bill_id)
 
     def locate_bill(self, bill_id: str):
-        for bill in self.bills:
-            if bill.get_bill_id == bill_id:
-                print(f"Bill found: {bill.get_bill_id}, Total: {bill.calculate_total():.2f}")
-                return bill
+        with self.lock.read():
+            bill = self.store.get_bill(bill_id)
+            total = self.pricing.bill_total(bill) if bill else None
+        if bill:
+            print(f"Bill found: {bill.get_bill_id}, Total: {total:.2f}")
+            return bill
         print("Bill not found.")
         return None
 
     def locate_purchase(self, order_id: str):
-        for purchase in self.purchases:
-            if purchase.get_order_id == order_id:
-                return purchase
-        return None
+        with self.lock.read():
+            return self.store.get_purchase(order_id)
 
     def generate_bill(self, order_id: str):
-        purchase = self.locate_purchase(order_id)
-        if purchase:
-            delivery_date = datetime.date.today()
-            delivery = Delivery(purchase, delivery_date)
-            bill_id = str(uuid.uuid4())
-            bill = Bill(bill_id, purchase.inventory, delivery)
-            self.bills.append(bill)
-            return bill
+        with self.lock.write():
+            purchase = self.store.get_purchase(order_id)
+            if purchase:
+                delivery_date = datetime.date.today()
+                delivery = Delivery(purchase, delivery_date)
+                bill_id = str(uuid.uuid4())
+                bill = Bill(bill_id, purchase.inventory, delivery)
+                self.store.add_bill(bill)
+                self.pricing.bills_added([bill])
+                return bill
         return None
 
     def remove_order_by_title(self, title: str):
-        for purchase in self.purchases:
-            if purchase.inventory.title.lower() == title.lower():
-                self.purchases.remove(purchase)
-                for bill in self.bills:
-                    if bill.delivery.purchase == purchase:
-                        self.bills.remove(bill)
-                        break
-                print(f"Order for {title} removed.")
-                return True
+        with self.lock.write():
+            purchase = self.store.find_purchase_by_title(title)
+            if purchase:
+                self.store.remove_purchase(purchase)
+                self.pricing.order_removed(purchase.order_id)
+        if purchase:
+            print(f"Order for {title} removed.")
+            return True
         print("Order not found.")
         return False
 
     def delete_order_by_title(self, title: str):
-        for purchase in self.purchases:
-            if purchase.inventory.title.lower() == title.lower():
-                self.purchases.remove(purchase)
-                for bill in self.bills:
-                    if bill.delivery.purchase == purchase:
-                        self.bills.remove(bill)
-                        break
-                print(f"Order for {title} removed.")
-                return True
-        print("Order not found.")
-        return False
+        return self.remove_order_by_title(title)
 
     def delete_order_by_id(self, order_id: str):
-        purchase = self.locate_purchase(order_id)
-        if purchase:
-            self.purchases.remove(purchase)
-            for bill in self.bills:
-                if bill.delivery.purchase == purchase:
-                    self.bills.remove(bill)
-                    break
+        with self.lock.write():
+            removed = self._remove_order(order_id)
+        if removed:
             print(f"Order with ID {order_id} removed.")
             return True
         print("Order not found.")
         return False
 
+    def remove_order(self, order_id: str):
+        # delete_order_by_id without the console output, for the service
+        with self.lock.write():
+            return self._remove_order(order_id)
+
+    def _remove_order(self, order_id: str):
+        purchase = self.store.get_purchase(order_id)
+        if purchase:
+            self.store.remove_purchase(purchase)
+            self.pricing.order_removed(purchase.order_id)
+        return purchase is not None
+
+    def _apply_shipping(self, bill: Bill, shipping_method: str):
+        table = self.pricing.table
+        priority = table.is_urgent(shipping_method)
+        if priority:
+            self.urgent_shipments.increment()
+        charge = bill.delivery.calculate_delivery_charge(priority=priority, charge=table.charge(shipping_method))
+        self.pricing.shipping_changed(bill)
+        return charge
+
     def integrate_shipping(self, bill_id: str, shipping_method: str):
-        bill = self.locate_bill(bill_id)
+        with self.lock.write():
+            bill = self.store.get_bill(bill_id)
+            if bill:
+                self._apply_shipping(bill, shipping_method)
+                self.store.update_delivery_charge(bill)
         if bill:
-            if shipping_method.lower() == "priority":
-                bill.delivery.calculate_delivery_charge(priority=True)
-            else:
-                bill.delivery.calculate_delivery_charge(priority=False)
             print(f"Shipping method {shipping_method} applied to bill {bill_id}.")
             return True
         print("Bill not found.")
         return False
 
+    # Batch operations for nightly fulfilment. Every ID is resolved in one pass,
+    # results are stored together, and each input gets one result record.
+    def generate_bills(self, order_ids):
+        order_ids = list(order_ids)
+        with self.lock.write():
+            purchases = self.store.get_purchases(order_ids)
+            delivery_date = datetime.date.today()
+            bills, results = [], []
+            for order_id in order_ids:
+                purchase = purchases.get(order_id)
+                if purchase is None:
+                    results.append({"order_id": order_id, "bill_id": None, "status": "order_not_found"})
+                    continue
+                bill = Bill(str(uuid.uuid4()), purchase.inventory, Delivery(purchase, delivery_date))
+                bills.append(bill)
+                results.append({"order_id": order_id, "bill_id": bill.bill_id, "status": "billed"})
+            self.store.add_bills(bills)
+            self.pricing.bills_added(bills)
+        return results
+
+    def apply_shipping_bulk(self, shipping_methods: dict):
+        with self.lock.write():
+            found = self.store.get_bills(shipping_methods)
+            updated, results = [], []
+            for bill_id, shipping_method in shipping_methods.items():
+                bill = found.get(bill_id)
+                if bill is None:
+                    results.append({"bill_id": bill_id, "delivery_charge": None, "status": "bill_not_found"})
+                    continue
+                charge = self._apply_shipping(bill, shipping_method)
+                updated.append(bill)
+                results.append({"bill_id": bill_id, "delivery_charge": charge, "status": "shipped"})
+            self.store.update_delivery_charges(updated)
+        return results
+
+    # Paged bill listing for the browser; see browse.py
+    def browse_bills(self, sort: str = "date", descending: bool = False, field: str = None, text: str = ""):
+        check_view_args(sort, field)
+        with self.lock.read():
+            return self.store.bill_view(sort, descending, field, text)
+
+    def bill_rows(self, view, offset: int, limit: int):
+        with self.lock.read():
+            return view.rows(offset, limit)
+
+    # Dashboard totals. The first read builds them from every bill; after
+    # that they are kept current by the mutations above and read in O(1).
+    def bill_total(self, bill_id: str):
+        with self.lock.read():
+            bill = self.store.get_bill(bill_id)
+            return self.pricing.bill_total(bill) if bill else None
+
+    def _totals(self):
+        if not self.pricing.aggregates_built:
+            self.pricing.build(self.store.bills)
+        return self.pricing
+
+    def client_total(self, client: Client):
+        with self.lock.read():
+            return self._totals().client_total(client)
+
+    def day_total(self, day: datetime.date):
+        with self.lock.read():
+            return self._totals().day_total(day)
+
+    def grand_total(self):
+        with self.lock.read():
+            return self._totals().grand_total
+
     def save_store_data(self):
-        store_data = {
-            "clients": [
-                {
-                    "full_name": client.full_name,
-                    "contact": client.contact,
-                    "email_address": client.email_address
-                }
-                for client in self.clients
-            ],
-            "items": [
-                {
-                    "title": item.title,
-                    "writer": item.writer,
-                    "cost": item.cost
-                }
-                for item in self.items
-            ],
-            "purchases": [
-                {
-                    "client": {
-                        "full_name": purchase.client.full_name,
-                        "contact": purchase.client.contact,
-                        "email_address": purchase.client.email_address
-                    },
-                    "inventory": {
-                        "title": purchase.inventory.title,
-                        "writer": purchase.inventory.writer,
-                        "cost": purchase.inventory.cost
-                    },
-                    "order_id": purchase.order_id
-                }
-                for purchase in self.purchases
-            ],
-            "bills": [
-                {
-                    "bill_id": bill.bill_id,
-                    "inventory": {
-                        "title": bill.inventory.title,
-                        "writer": bill.inventory.writer,
-                        "cost": bill.inventory.cost
-                    },
-                    "delivery": {
-                        "purchase": {
-                            "client": {
-                                "full_name": bill.delivery.purchase.client.full_name,
-                                "contact": bill.delivery.purchase.client.contact,
-                                "email_address": bill.delivery.purchase.client.email_address
-                            },
-                            "inventory": {
-                                "title": bill.delivery.purchase.inventory.title,
-                                "writer": bill.delivery.purchase.inventory.writer,
-                                "cost": bill.delivery.purchase.inventory.cost
-                            },
-                            "order_id": bill.delivery.purchase.order_id
-                        },
-                        "delivery_date": bill.delivery.delivery_date.isoformat(),
-                        "delivery_charge": bill.delivery.delivery_charge
-                    }
-                }
-                for bill in self.bills
-            ]
-        }
-        with open("store_data.json", "w") as f:
-            json.dump(store_data, f, indent=4)
+        with self.lock.write():
+            if self._loaded:  # Never loaded means nothing to save
+                self._store.save()
 
     def load_store_data(self):
-        try:
-            with open("store_data.json", "r") as f:
-                store_data = json.load(f)
-                for client_info in store_data.get("clients", []):
-                    self.clients.append(Client(client_info["full_name"], client_info["contact"], client_info["email_address"]))
-                for item_info in store_data.get("items", []):
-                    self.items.append(Inventory(item_info["title"], item_info["writer"], item_info["cost"]))
-                for purchase_info in store_data.get("purchases", []):
-                    client_data = purchase_info["client"]
-                    client = Client(client_data["full_name"], client_data["contact"], client_data["email_address"])
-
-                    inventory_data = purchase_info["inventory"]
-                    item = Inventory(inventory_data["title"], inventory_data["writer"], inventory_data["cost"])
-
-                    purchase = Purchase(client, item)
-                    purchase.order_id = purchase_info["order_id"]  # Load the order ID
-
-                    self.purchases.append(purchase)
-                for bill_info in store_data.get("bills", []):
-                    client_data = bill_info["delivery"]["purchase"]["client"]
-                    client = Client(client_data["full_name"], client_data["contact"], client_data["email_address"])
-
-                    inventory_data = bill_info["delivery"]["purchase"]["inventory"]
-                    item = Inventory(inventory_data["title"], inventory_data["writer"], inventory_data["cost"])
-
-                    purchase = Purchase(client, item)
-                    purchase.order_id = bill_info["delivery"]["purchase"]["order_id"]  # Load the order ID
-
-                    delivery_data = bill_info["delivery"]
-                    delivery_date = datetime.date.fromisoformat(delivery_data["delivery_date"])
-                    delivery = Delivery(purchase, delivery_date)
-                    delivery.update_delivery_charge(delivery_data["delivery_charge"])
-
-                    self.bills.append(Bill(bill_info["bill_id"], item, delivery))
-        except FileNotFoundError:
-            pass
-        except Exception as e:
-            print(f"Error loading data: {e}")
+        with self.lock.write(), self._load_lock:
+            self._store.load()
+            self._loaded = True
+            self.pricing.reset()
+
+    def close(self):
+        with self.lock.write():
+            self._store.close()
 
     def save_orders_to_text(self):
-        with open("student2_orders.txt", "w") as f:
-            for bill in self.bills:
-                f.write(f"Bill ID: {bill.get_bill_id}\n")
-                f.write(f"Client: {bill.delivery.purchase.client.get_full_name}\n")
-                f.write(f"Contact: {bill.delivery.purchase.client.get_contact}\n")
-                f.write(f"Email: {bill.delivery.purchase.client.get_email_address}\n")
-                f.write(f"Book Title: {bill.inventory.get_title}\n")
-                f.write(f"Writer: {bill.inventory.get_writer}\n")
-                f.write(f"Cost: {bill.inventory.get_cost}\n")
-                f.write(f"Delivery Date: {bill.delivery.get_delivery_date}\n")
-                f.write(f"Delivery Charge: {bill.delivery.get_delivery_charge}\n")
-                f.write(f"Total Amount: {bill.calculate_total()}\n")
-                f.write("\n")
+        write_bills(self.bills, "student2_orders.txt")
+
+# Runs manager work on a single background thread so the Tk event loop never
+# blocks on loads, saves, exports or batch jobs. Tasks run in submission
+# order; their results are queued and handed to the callbacks on the UI
+# thread by a window.after poll.
+class BackgroundWorker:
+    POLL_MS = 50
+
+    def __init__(self, window, on_status=None):
+        self.window = window
+        self.on_status = on_status  # Called with a label while busy, None when idle
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bookstore-worker")
+        self._results = queue.Queue()
+        self._labels = []  # Labels of submitted tasks that have not reported back yet
+        self.window.after(self.POLL_MS, self._poll)
+
+    @property
+    def busy(self):
+        return bool(self._labels)
+
+    def submit(self, label: str, fn, *args, on_done=None, on_error=None):
+        self._labels.append(label)
+        self._report_status()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._results.put((label, f, on_done, on_error)))
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _poll(self):
+        while True:
+            try:
+                label, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._labels.remove(label)
+            self._report_status()
+            error = future.exception()
+            if error is not None:
+                (on_error or self._show_error)(error)
+            elif on_done is not None:
+                on_done(future.result())
+        self.window.after(self.POLL_MS, self._poll)
+
+    def _report_status(self):
+        if self.on_status is not None:
+            self.on_status(self._labels[-1] if self._labels else None)
+
+    @staticmethod
+    def _show_error(error):
+        messagebox.showerror("Error", str(error))
+
+# Bill list for stores of any size. The Treeview only ever holds the rows on
+# screen. They are cut from a block of BLOCK_ROWS rows read around the scroll
+# position on the worker thread, and the scrollbar is driven by hand from the
+# length of the view. Sorting and filtering rebuild the view in the data
+# layer (BookstoreManager.browse_bills) rather than in the widget.
+class BillBrowser:
+    VISIBLE_ROWS = 25
+    BLOCK_ROWS = 500
+    WHEEL_ROWS = 3
+    HEADINGS = {"delivery_date": ("Date", 90), "client": ("Client", 180), "title": ("Title", 240),
+                "total": ("Total", 70), "bill_id": ("Bill ID", 260), "order_id": ("Order ID", 260)}
+    SORT_FIELDS = {"delivery_date": "date", "client": "client", "title": "title"}  # Column -> browse_bills sort
+
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.window)
+        self.window.title("Bills")
+        self.sort, self.descending = "date", True  # Newest first
+        self.view = None
+        self.total = 0
+        self.offset = 0  # First visible row
+        self.block_start, self.block = 0, []  # Rows read around the visible ones
+        self.generation = 0  # Bumped on every rebuild, so late answers for an old view are dropped
+        self.fetching = False
+
+        bar = tk.Frame(self.window)
+        bar.pack(side="top", fill="x", padx=10, pady=5)
+        tk.Label(bar, text="Filter:").pack(side="left")
+        self.filter_field = ttk.Combobox(bar, values=BILL_FILTER_FIELDS, state="readonly", width=8)
+        self.filter_field.set(BILL_FILTER_FIELDS[0])
+        self.filter_field.pack(side="left", padx=5)
+        self.filter_text = tk.Entry(bar, width=40)
+        self.filter_text.pack(side="left")
+        self.filter_text.bind("<Return>", lambda event: self.rebuild())
+        tk.Button(bar, text="Apply", command=self.rebuild).pack(side="left", padx=5)
+        tk.Button(bar, text="Refresh", command=self.rebuild).pack(side="left")
+        self.count_label = tk.Label(bar, text="")
+        self.count_label.pack(side="right")
+
+        body = tk.Frame(self.window)
+        body.pack(side="top", fill="x", padx=10, pady=5)
+        self.tree = ttk.Treeview(body, columns=BILL_COLUMNS, show="headings", height=self.VISIBLE_ROWS,
+                                 selectmode="browse")
+        for column in BILL_COLUMNS:
+            text, width = self.HEADINGS[column]
+            self.tree.column(column, width=width, stretch=column == "title")
+            if column in self.SORT_FIELDS:
+                self.tree.heading(column, text=text, command=lambda sort=self.SORT_FIELDS[column]: self.sort_by(sort))
+            else:
+                self.tree.heading(column, text=text)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scrollbar)
+        self.tree.pack(side="left", fill="x", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        self.tree.bind("<Prior>", lambda event: self.scroll_to(self.offset - self.VISIBLE_ROWS))
+        self.tree.bind("<Next>", lambda event: self.scroll_to(self.offset + self.VISIBLE_ROWS))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(self.total))
+        self.tree.bind("<Double-1>", self.use_selected)
+        tk.Label(self.window, text="Double-click a bill to copy its IDs into the main window.").pack(pady=(0, 5))
+
+        self.rebuild()
+
+    def rebuild(self):
+        self.generation += 1
+        generation = self.generation
+        args = (self.sort, self.descending, self.filter_field.get(), self.filter_text.get())
+
+        def done(view):
+            if generation != self.generation or not self.window.winfo_exists():
+                return
+            self.view, self.total = view, len(view)
+            self.offset, self.block_start, self.block = 0, 0, []
+            self.count_label.config(text=f"{self.total} bills")
+            self.render()
+
+        self.app.worker.submit("Sorting bills...", lambda: self.app.manager.browse_bills(*args), on_done=done)
+
+    def sort_by(self, sort: str):
+        # A second click on the same column flips the direction
+        self.descending = not self.descending if sort == self.sort else False
+        self.sort = sort
+        self.rebuild()
+
+    def scroll_to(self, offset: int):
+        self.offset = max(0, min(offset, self.total - self.VISIBLE_ROWS))
+        self.render()
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        else:
+            self.scroll_to(self.offset + int(amount) * (self.VISIBLE_ROWS if unit == "pages" else 1))
+
+    def on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        return self.scroll_to(self.offset + (-self.WHEEL_ROWS if up else self.WHEEL_ROWS))
+
+    def render(self):
+        end = min(self.offset + self.VISIBLE_ROWS, self.total)
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, end / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+        start = self.offset - self.block_start
+        if start < 0 or self.block_start + len(self.block) < end:
+            self.fetch_block()  # Keep showing the old rows until the block arrives
+            return
+        self.tree.delete(*self.tree.get_children())
+        for row in self.block[start:start + end - self.offset]:
+            self.tree.insert("", "end", values=row)
+
+    def fetch_block(self):
+        if self.fetching or self.view is None:
+            return  # The block in flight re-renders at the newest offset when it lands
+        self.fetching = True
+        generation, view = self.generation, self.view
+        start = max(0, self.offset - (self.BLOCK_ROWS - self.VISIBLE_ROWS) // 2)
+
+        def done(rows):
+            self.fetching = False
+            if not self.window.winfo_exists():
+                return
+            if generation == self.generation:
+                # A short block would look uncovered forever and be fetched again and again
+                expected = min(self.BLOCK_ROWS, self.total - start)
+                self.block_start, self.block = start, rows + [MISSING_BILL_ROW] * (expected - len(rows))
+            self.render()
+
+        def failed(error):
+            self.fetching = False
+            BackgroundWorker._show_error(error)
+
+        self.app.worker.submit("Loading bills...", self.app.manager.bill_rows, view, start, self.BLOCK_ROWS,
+                               on_done=done, on_error=failed)
+
+    def use_selected(self, event=None):
+        selected = self.tree.focus()
+        if not selected:
+            return
+        values = self.tree.item(selected, "values")
+        bill_id, order_id = values[BILL_COLUMNS.index("bill_id")], values[BILL_COLUMNS.index("order_id")]
+        if not bill_id:
+            return  # Deleted since the view was built
+        for entry, value in ((self.app.bill_id_input, bill_id), (self.app.order_id_input, order_id),
+                             (self.app.delete_order_id_input, order_id)):
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
+
+# Startup numbers for python main.py --startup-timing: how long the imports
+# took, and when each milestone was reached, in ms since main.py started
+class StartupTiming:
+    def __init__(self, tkinter_seconds: float, on_complete=None):
+        self.durations = {"import": (IMPORTED - STARTED) * 1000, "tkinter import": tkinter_seconds * 1000}
+        self.marks = {}
+        self.on_complete = on_complete  # Called once the window is painted and the store loaded
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, (time.perf_counter() - STARTED) * 1000)
+        if "first paint" in self.marks and "store load" in self.marks and self.on_complete is not None:
+            on_complete, self.on_complete = self.on_complete, None
+            on_complete()
+
+    def report(self):
+        for name, ms in self.durations.items():
+            print(f"{name:<16}{ms:>9.1f} ms")
+        for name, ms in self.marks.items():
+            print(f"{name:<16}{ms:>9.1f} ms after start")
 
 # GUI Application
 class BookstoreApp:
-    def __init__(self, window):
+    # The window opens with just the menu and status bar. The store loads on
+    # the worker from the start, and the forms are built once the window has
+    # been painted.
+    def __init__(self, window, store: StoreBackend = None, timing: StartupTiming = None):
+        import_tk()
         self.window = window
         self.window.title("Bookstore Management")
         self.window.geometry("1000x800")
         self.window.configure(bg="#f0f0f0")
 
-        # Manager instance
-        self.manager = BookstoreManager()
+        # Manager instance, created and only ever used on the worker thread
+        self.manager = None
+        self.closing = False
+        self.bill_browser = None
+        self.forms_built = False
+        self.timing = timing
+
+        self.setup_menu()
+        self.setup_status_bar()
+
+        self.worker = BackgroundWorker(self.window, self.set_status)
+        self.worker.submit("Loading store...", self.load_manager, store, on_done=self.store_loaded)
+
+        self.window.bind("<Map>", self.on_first_map, add="+")
+        self.window.protocol("WM_DELETE_WINDOW", self.on_exit)
 
-        # Interface setup
+    def load_manager(self, store):
+        self.manager = BookstoreManager(store)
+        self.manager.load_store_data()  # Now, rather than on the clerk's first click
+
+    def store_loaded(self, _=None):
+        if self.timing is not None:
+            self.timing.mark("store load")
+
+    def on_first_map(self, event):
+        if event.widget is not self.window or self.forms_built:
+            return
+        self.forms_built = True
+        self.window.update_idletasks()  # Draw the empty window before building the forms
+        if self.timing is not None:
+            self.timing.mark("first paint")
+        self.window.after_idle(self.setup_forms)
+
+    def setup_forms(self):
         self.setup_client_section()
         self.setup_inventory_section()
         self.setup_purchase_section()
         self.setup_bill_section()
-
-        self.window.protocol("WM_DELETE_WINDOW", self.on_exit)
+        if self.timing is not None:
+            self.timing.mark("forms built")
+
+    def setup_menu(self):
+        menubar = tk.Menu(self.window)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Save Now", command=self.save_now)
+        file_menu.add_command(label="Export Orders...", command=self.export_orders)
+        file_menu.add_separator()
+        file_menu.add_command(label="Bill Orders From File...", command=self.bill_orders_from_file)
+        file_menu.add_command(label="Apply Shipping From File...", command=self.ship_bills_from_file)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.on_exit)
+        menubar.add_cascade(label="File", menu=file_menu)
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_command(label="Browse Bills...", command=self.open_bill_browser)
+        menubar.add_cascade(label="View", menu=view_menu)
+        self.window.config(menu=menubar)
+
+    def setup_status_bar(self):
+        frame = tk.Frame(self.window, bg="#d0d0d0")
+        frame.pack(side="bottom", fill="x")
+        self.status_label = tk.Label(frame, text="Ready", bg="#d0d0d0", anchor="w")
+        self.status_label.pack(side="left", padx=10)
+        self.progress = ttk.Progressbar(frame, mode="indeterminate", length=200)
+        self.progress.pack(side="right", padx=10, pady=2)
+
+    def set_status(self, label):
+        if label:
+            self.status_label.config(text=label)
+            self.progress.start(10)
+        else:
+            self.status_label.config(text="Ready")
+            self.progress.stop()
 
     def setup_client_section(self):
         frame = tk.LabelFrame(self.window, text="Client Information", padx=10, pady=10, bg="#e0e0e0")
@@ -374,8 +695,9 @@ class BookstoreApp:
         self.purchase_client_input.grid(row=0, column=1, sticky="ew")
 
         tk.Label(frame, text="Book Title:", bg="#e0e0e0").grid(row=1, column=0, sticky="w")
-        self.purchase_title_input = tk.Entry(frame, width=50)
+        self.purchase_title_input = ttk.Combobox(frame, width=48)
         self.purchase_title_input.grid(row=1, column=1, sticky="ew")
+        self.purchase_title_input.bind("<KeyRelease>", self.suggest_titles)
 
         tk.Button(frame, text="Add Purchase", command=self.add_purchase, bg="#4CAF50", fg="white", width=20).grid(row=2, columnspan=2, pady=5)
 
@@ -408,73 +730,250 @@ class BookstoreApp:
         tk.Button(frame, text="Delete Order", command=self.delete_order, bg="#f44336", fg="white", width=20).grid(row=5, columnspan=2, pady=5)
 
     def add_client(self):
-        full_name = self.client_name_input.get()
-        contact = self.client_contact_input.get()
-        email_address = self.client_email_input.get()
-        client = Client(full_name, contact, email_address)
-        self.manager.clients.append(client)
-        messagebox.showinfo("Success", "Client added successfully")
+        try:
+            client = Client(*validate_client(self.client_name_input.get(), self.client_contact_input.get(),
+                                             self.client_email_input.get()))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.worker.submit("Adding client...", lambda: self.manager.add_client(client),
+                           on_done=lambda _: messagebox.showinfo("Success", "Client added successfully"))
 
     def add_inventory(self):
-        title = self.inventory_title_input.get()
-        writer = self.inventory_writer_input.get()
-        cost = float(self.inventory_cost_input.get())
-        item = Inventory(title, writer, cost)
-        self.manager.items.append(item)
-        messagebox.showinfo("Success", "Inventory item added successfully")
+        try:
+            item = Inventory(*validate_item(self.inventory_title_input.get(), self.inventory_writer_input.get(),
+                                            self.inventory_cost_input.get()))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.worker.submit("Adding inventory...", lambda: self.manager.add_inventory(item),
+                           on_done=lambda _: messagebox.showinfo("Success", "Inventory item added successfully"))
 
     def add_purchase(self):
         client_name = self.purchase_client_input.get()
         book_title = self.purchase_title_input.get()
-        client = next((c for c in self.manager.clients if c.get_full_name == client_name), None)
-        item = next((i for i in self.manager.items if i.get_title == book_title), None)
-        if client and item:
-            purchase = Purchase(client, item)
-            self.manager.purchases.append(purchase)
-            messagebox.showinfo("Success", f"Purchase added successfully. Order ID: {purchase.get_order_id}")
-        else:
-            messagebox.showerror("Error", "Client or Inventory item not found")
+
+        def work():
+            client = self.manager.find_client(client_name)
+            item = self.manager.resolve_item(book_title)
+            if client and item:
+                return self.manager.add_purchase(Purchase(client, item)), []
+            suggestions = [] if item else self.manager.search_items(book_title, 5)
+            return None, [suggestion.get_title for suggestion in suggestions]
+
+        def done(result):
+            purchase, suggestions = result
+            if purchase:
+                messagebox.showinfo("Success", f"Purchase added successfully. Order ID: {purchase.get_order_id}")
+            elif suggestions:
+                messagebox.showerror("Error", "Client or Inventory item not found\nDid you mean: " + ", ".join(suggestions))
+            else:
+                messagebox.showerror("Error", "Client or Inventory item not found")
+
+        self.worker.submit("Adding purchase...", work, on_done=done)
+
+    def suggest_titles(self, event=None):
+        query = self.purchase_title_input.get()
+        if len(query.strip()) < 2:
+            return
+
+        def done(titles):
+            # Skip answers for text the clerk has already typed past
+            if self.purchase_title_input.get() == query:
+                self.purchase_title_input["values"] = titles
+
+        self.worker.submit("Searching...", lambda: [item.get_title for item in self.manager.search_items(query)],
+                           on_done=done)
 
     def generate_bill(self):
         order_id = self.order_id_input.get()
-        bill = self.manager.generate_bill(order_id)
-        if bill:
-            messagebox.showinfo("Success", f"Bill generated successfully. Bill ID: {bill.get_bill_id}")
-        else:
-            messagebox.showerror("Error", "Order not found")
+
+        def done(bill):
+            if bill:
+                messagebox.showinfo("Success", f"Bill generated successfully. Bill ID: {bill.get_bill_id}")
+            else:
+                messagebox.showerror("Error", "Order not found")
+
+        self.worker.submit("Generating bill...", lambda: self.manager.generate_bill(order_id), on_done=done)
 
     def locate_bill(self):
         bill_id = self.bill_id_input.get()
-        bill = self.manager.locate_bill(bill_id)
-        if bill:
-            messagebox.showinfo("Bill Found", f"Bill ID: {bill.get_bill_id}\nTotal: {bill.calculate_total():.2f}")
-        else:
-            messagebox.showerror("Error", "Bill not found")
+
+        def done(bill):
+            if bill:
+                messagebox.showinfo("Bill Found", f"Bill ID: {bill.get_bill_id}\nTotal: {bill.total_amount:.2f}")
+            else:
+                messagebox.showerror("Error", "Bill not found")
+
+        self.worker.submit("Locating bill...", lambda: self.manager.locate_bill(bill_id), on_done=done)
 
     def apply_shipping(self):
         bill_id = self.bill_id_input.get()
         shipping_method = self.shipping_method_input.get()
-        if self.manager.integrate_shipping(bill_id, shipping_method):
-            messagebox.showinfo("Success", f"Shipping method {shipping_method} applied to bill {bill_id}")
-        else:
-            messagebox.showerror("Error", "Bill not found")
+
+        def done(applied):
+            if applied:
+                messagebox.showinfo("Success", f"Shipping method {shipping_method} applied to bill {bill_id}")
+            else:
+                messagebox.showerror("Error", "Bill not found")
+
+        self.worker.submit("Applying shipping...", lambda: self.manager.integrate_shipping(bill_id, shipping_method),
+                           on_done=done)
 
     def delete_order(self):
         order_id = self.delete_order_id_input.get()
-        if self.manager.delete_order_by_id(order_id):
-            messagebox.showinfo("Success", f"Order with ID {order_id} deleted")
-        else:
-            messagebox.showerror("Error", "Order not found")
 
-    def on_exit(self):
-        self.manager.save_store_data()
-        self.manager.save_orders_to_text()
-        self.window.destroy()
+        def done(deleted):
+            if deleted:
+                messagebox.showinfo("Success", f"Order with ID {order_id} deleted")
+            else:
+                messagebox.showerror("Error", "Order not found")
+
+        self.worker.submit("Deleting order...", lambda: self.manager.delete_order_by_id(order_id), on_done=done)
+
+    def open_bill_browser(self):
+        if self.bill_browser is not None and self.bill_browser.window.winfo_exists():
+            self.bill_browser.window.lift()
+            return
+        self.bill_browser = BillBrowser(self)
+
+    def save_now(self):
+        self.worker.submit("Saving store...", lambda: self.manager.save_store_data(),
+                           on_done=lambda _: messagebox.showinfo("Success", "Store saved"))
+
+    def export_orders(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Orders", defaultextension=".txt",
+            filetypes=[("Text report", "*.txt"), ("CSV", "*.csv"), ("JSON lines", "*.jsonl")])
+        if not path:
+            return
+        extension = path.rsplit(".", 1)[-1].lower()
+        fmt = extension if extension in EXPORT_FORMATS else "text"
+        self.worker.submit(f"Exporting orders to {path}...", lambda: export_bills(self.manager.store, path, fmt),
+                           on_done=lambda result: messagebox.showinfo("Success", f"Exported {result[0]} bills"))
+
+    def bill_orders_from_file(self):
+        path = filedialog.askopenfilename(title="Order IDs to Bill")
+        if not path:
+            return
+        self.worker.submit("Generating bills...", lambda: self.manager.generate_bills(read_id_lines(path)),
+                           on_done=lambda results: self.show_batch_summary("Billed", results, "billed"))
+
+    def ship_bills_from_file(self):
+        path = filedialog.askopenfilename(title="Bill IDs and Shipping Methods")
+        if not path:
+            return
+        self.worker.submit("Applying shipping...", lambda: self.manager.apply_shipping_bulk(read_shipping_lines(path)),
+                           on_done=lambda results: self.show_batch_summary("Shipped", results, "shipped"))
+
+    def show_batch_summary(self, verb: str, results: list, ok_status: str):
+        done = sum(result["status"] == ok_status for result in results)
+        messagebox.showinfo("Batch Complete", f"{verb} {done} of {len(results)}")
+
+    def save_and_close(self):
+        if self.manager is not None:
+            self.manager.save_orders_to_text()  # Before close, which drops a SQLite connection
+            self.manager.close()
 
-if __name__ == "__main__":
+    def on_exit(self):
+        # Let queued work and the final save finish on the worker; the window
+        # stays responsive and is destroyed once they report back.
+        if self.closing:
+            return
+        self.closing = True
+
+        def close_window(_=None):
+            self.worker.shutdown()
+            self.window.destroy()
+
+        def save_failed(error):
+            messagebox.showerror("Error", f"Saving failed: {error}")
+            close_window()
+
+        self.worker.submit("Saving store...", self.save_and_close, on_done=close_window, on_error=save_failed)
+
+# Command line. With no command the GUI opens; the batch commands run headless:
+#
+#   python main.py [store.db | store_dir/]
+#   python main.py --startup-timing [store.db]   # print startup milestones, then exit
+#   python main.py bill ORDER_IDS_FILE [--db store.db | store_dir/] [--output results.jsonl]
+#   python main.py ship SHIPPING_FILE [--db store.db | store_dir/] [--output results.jsonl]
+#
+# ORDER_IDS_FILE has one order ID per line; SHIPPING_FILE has "bill_id,method"
+# lines. Results are written as one JSON object per line.
+def read_id_lines(path: str):
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def parse_shipping_lines(lines: list):
+    shipping_methods = {}
+    for line in lines:
+        bill_id, _, shipping_method = line.partition(",")
+        shipping_methods[bill_id.strip()] = shipping_method.strip() or "standard"
+    return shipping_methods
+
+def read_shipping_lines(path: str):
+    return parse_shipping_lines(read_id_lines(path))
+
+def run_batch(args):
+    manager = BookstoreManager(open_store(args.db) if args.db else None)
+    try:
+        lines = read_id_lines(args.input_file)
+        if args.command == "bill":
+            results = manager.generate_bills(lines)
+            done = sum(result["status"] == "billed" for result in results)
+        else:
+            results = manager.apply_shipping_bulk(parse_shipping_lines(lines))
+            done = sum(result["status"] == "shipped" for result in results)
+    finally:
+        manager.close()
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if args.output:
+            out.close()
+    print(f"{args.command}: {done} of {len(results)} succeeded", file=sys.stderr)
+    return 0 if done == len(results) else 1
+
+def main(argv):
+    if argv and argv[0] in ("bill", "ship"):
+        parser = argparse.ArgumentParser(prog="main.py", description="Headless batch billing and shipping")
+        parser.add_argument("command", choices=("bill", "ship"))
+        parser.add_argument("input_file")
+        parser.add_argument("--db",
+                            help="SQLite file, sharded store directory or .json snapshot instead of store_data.json")
+        parser.add_argument("--output", help="write results here instead of stdout")
+        return run_batch(parser.parse_args(argv))
+
+    parser = argparse.ArgumentParser(prog="main.py", description="Bookstore management GUI")
+    parser.add_argument("store", nargs="?",
+                        help="SQLite file, sharded store directory or .json snapshot instead of store_data.json")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="print import, first-paint and store-load times in ms, then exit")
+    args = parser.parse_args(argv)
+
+    store = open_store(args.store) if args.store else None
+    start = time.perf_counter()
+    import_tk()
+    timing = StartupTiming(time.perf_counter() - start) if args.startup_timing else None
     root = tk.Tk()
-    app = BookstoreApp(root)
+    app = BookstoreApp(root, store, timing)
+    if timing is not None:
+        def finish():
+            # Nothing was changed, so there is nothing to save
+            app.worker.shutdown()
+            root.destroy()
+        timing.on_complete = lambda: root.after_idle(finish)
     root.mainloop()
+    if timing is not None:
+        timing.report()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
 
 import json
 
@@ -0,0 +1,175 @@
+import bisect
+import functools
+import threading
+import time
+
+# Call counts, latency histograms, lookup hit/miss counts and store I/O for a
+# BookstoreManager.
+#
+#   metrics = Metrics()
+#   manager = BookstoreManager(store, metrics=metrics)
+#   metrics.snapshot()          # plain dict
+#   metrics.prometheus_text()   # Prometheus text exposition format
+#
+# instrument() wraps the listed methods on the manager instance only, so a
+# manager built without metrics runs the plain class methods with no
+# overhead at all.
+
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+INSTRUMENTED_METHODS = (
+    "add_client", "add_inventory", "add_purchase", "add_clients", "add_inventory_items", "update_inventory_cost",
+    "find_client", "find_item", "search_items", "resolve_item",
+    "get_bill", "locate_bill", "locate_purchase", "generate_bill", "generate_bills", "remove_order_by_title",
+    "delete_order_by_id", "remove_order", "integrate_shipping", "apply_shipping_bulk", "save_orders_to_text",
+)
+# Operations whose result says whether the record was found
+LOOKUP_METHODS = (
+    "find_client", "find_item", "resolve_item", "get_bill", "locate_bill", "locate_purchase", "generate_bill",
+    "remove_order_by_title", "delete_order_by_id", "remove_order", "integrate_shipping", "update_inventory_cost",
+)
+# Operations that move the whole store to or from disk
+STORE_IO_METHODS = ("load_store_data", "save_store_data", "close")
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def cumulative(self):
+        running, counts = 0, []
+        for count in self.buckets:
+            running += count
+            counts.append(running)
+        return counts
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._latency = {}  # operation -> Histogram
+            self._errors = {}  # operation -> exceptions raised
+            self._hits = {}  # operation -> [hits, misses]
+            self._store_io = {}  # operation -> {"seconds", "bytes"} of the last run
+
+    def observe(self, operation: str, seconds: float, found=None, error: bool = False):
+        with self._lock:
+            histogram = self._latency.get(operation)
+            if histogram is None:
+                histogram = self._latency[operation] = Histogram()
+            histogram.observe(seconds)
+            if error:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+            elif found is not None:
+                self._hits.setdefault(operation, [0, 0])[0 if found else 1] += 1
+
+    def observe_store_io(self, operation: str, seconds: float, size: int):
+        with self._lock:
+            self._store_io[operation] = {"seconds": seconds, "bytes": size}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "operations": {
+                    operation: {
+                        "calls": histogram.count,
+                        "seconds": histogram.total,
+                        "errors": self._errors.get(operation, 0),
+                        "buckets": dict(zip(LATENCY_BUCKETS + (float("inf"),), histogram.cumulative())),
+                    }
+                    for operation, histogram in self._latency.items()
+                },
+                "lookups": {
+                    operation: {"hits": hits, "misses": misses,
+                                "hit_ratio": hits / (hits + misses) if hits + misses else None}
+                    for operation, (hits, misses) in self._hits.items()
+                },
+                "store_io": {operation: dict(io) for operation, io in self._store_io.items()},
+            }
+
+    def prometheus_text(self):
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP bookstore_operation_seconds Latency of BookstoreManager operations.",
+            "# TYPE bookstore_operation_seconds histogram",
+        ]
+        for operation, stats in snapshot["operations"].items():
+            for bound, count in stats["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'bookstore_operation_seconds_bucket{{operation="{operation}",le="{le}"}} {count}')
+            lines.append(f'bookstore_operation_seconds_sum{{operation="{operation}"}} {stats["seconds"]!r}')
+            lines.append(f'bookstore_operation_seconds_count{{operation="{operation}"}} {stats["calls"]}')
+        lines += [
+            "# HELP bookstore_operation_errors_total Operations that raised an exception.",
+            "# TYPE bookstore_operation_errors_total counter",
+        ]
+        for operation, stats in snapshot["operations"].items():
+            lines.append(f'bookstore_operation_errors_total{{operation="{operation}"}} {stats["errors"]}')
+        lines += [
+            "# HELP bookstore_lookups_total Lookups by whether the record was found.",
+            "# TYPE bookstore_lookups_total counter",
+        ]
+        for operation, stats in snapshot["lookups"].items():
+            lines.append(f'bookstore_lookups_total{{operation="{operation}",result="hit"}} {stats["hits"]}')
+            lines.append(f'bookstore_lookups_total{{operation="{operation}",result="miss"}} {stats["misses"]}')
+        lines += [
+            "# HELP bookstore_store_io_seconds Duration of the last store load, save or close.",
+            "# TYPE bookstore_store_io_seconds gauge",
+        ]
+        for operation, io in snapshot["store_io"].items():
+            lines.append(f'bookstore_store_io_seconds{{operation="{operation}"}} {io["seconds"]!r}')
+        lines += [
+            "# HELP bookstore_store_bytes Bytes on disk after the last store load, save or close.",
+            "# TYPE bookstore_store_bytes gauge",
+        ]
+        for operation, io in snapshot["store_io"].items():
+            lines.append(f'bookstore_store_bytes{{operation="{operation}"}} {io["bytes"]}')
+        return "\n".join(lines) + "\n"
+
+def _timed(metrics: Metrics, operation: str, method, lookup: bool):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            metrics.observe(operation, time.perf_counter() - start, error=True)
+            raise
+        metrics.observe(operation, time.perf_counter() - start, bool(result) if lookup else None)
+        return result
+    return wrapper
+
+def _timed_store_io(metrics: Metrics, operation: str, method, store):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            metrics.observe(operation, time.perf_counter() - start, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+        metrics.observe(operation, elapsed)
+        metrics.observe_store_io(operation, elapsed, store.stored_bytes())
+        return result
+    return wrapper
+
+def instrument(manager, metrics: Metrics, store):
+    # Shadow the class methods with timed wrappers on this instance. store is
+    # the manager's backend, passed in so sizing it never triggers a load.
+    for name in INSTRUMENTED_METHODS:
+        setattr(manager, name, _timed(metrics, name, getattr(manager, name), name in LOOKUP_METHODS))
+    for name in STORE_IO_METHODS:
+        setattr(manager, name, _timed_store_io(metrics, name, getattr(manager, name), store))
+    return manager
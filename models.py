@@ -0,0 +1,116 @@
+import datetime
+import threading
+import uuid  # For generating unique order IDs
+
+# Core entities. Each uses __slots__ so a store with millions of bills does
+# not pay for a per-instance __dict__.
+class Client:
+    __slots__ = ("full_name", "contact", "email_address")
+
+    def __init__(self, full_name: str, contact: str, email_address: str):
+        self.full_name = full_name
+        self.contact = contact
+        self.email_address = email_address
+
+    @property
+    def get_full_name(self):
+        return self.full_name
+
+    @property
+    def get_contact(self):
+        return self.contact
+
+    @property
+    def get_email_address(self):
+        return self.email_address
+
+class Inventory:
+    __slots__ = ("title", "writer", "cost")
+
+    def __init__(self, title: str, writer: str, cost: float):
+        self.title = title
+        self.writer = writer
+        self.cost = cost
+
+    @property
+    def get_title(self):
+        return self.title
+
+    @property
+    def get_writer(self):
+        return self.writer
+
+    @property
+    def get_cost(self):
+        return self.cost
+
+class Purchase:
+    __slots__ = ("client", "inventory", "order_id")
+
+    def __init__(self, client: Client, inventory: Inventory, order_id: str = None):
+        self.client = client
+        self.inventory = inventory
+        # Generate a unique order ID unless an existing one is being loaded
+        self.order_id = order_id if order_id is not None else str(uuid.uuid4())
+
+    @property
+    def get_client(self):
+        return self.client
+
+    @property
+    def get_inventory(self):
+        return self.inventory
+
+    @property
+    def get_order_id(self):
+        return self.order_id
+
+class Delivery:
+    __slots__ = ("purchase", "delivery_date", "delivery_charge")
+    urgent_shipments = 0  # Process-wide total; BookstoreManager keeps its own per-manager count
+    _urgent_lock = threading.Lock()
+    PRIORITY_CHARGE = 6.50
+    STANDARD_CHARGE = 4.20
+
+    def __init__(self, purchase: Purchase, delivery_date: datetime.date):
+        self.purchase = purchase
+        self.delivery_date = delivery_date
+        self.delivery_charge = 0.0
+
+    @property
+    def get_delivery_date(self):
+        return self.delivery_date
+
+    @property
+    def get_delivery_charge(self):
+        return self.delivery_charge
+
+    def update_delivery_charge(self, charge: float):
+        self.delivery_charge = charge
+
+    def calculate_delivery_charge(self, priority: bool, charge: float = None):
+        # charge overrides the built-in rate, e.g. with one from a pricing.ShippingTable
+        if priority:
+            self.delivery_charge = Delivery.PRIORITY_CHARGE if charge is None else charge
+            with Delivery._urgent_lock:
+                Delivery.urgent_shipments += 1
+        else:
+            self.delivery_charge = Delivery.STANDARD_CHARGE if charge is None else charge
+        return self.delivery_charge
+
+class Bill:
+    __slots__ = ("bill_id", "inventory", "delivery", "total_amount")
+
+    def __init__(self, bill_id: str, inventory: Inventory, delivery: Delivery):
+        self.bill_id = bill_id
+        self.inventory = inventory
+        self.delivery = delivery
+        self.total_amount = 0.0
+
+    @property
+    def get_bill_id(self):
+        return self.bill_id
+
+    def calculate_total(self):
+        self.total_amount = self.inventory.get_cost + self.delivery.get_delivery_charge
+        return self.total_amount
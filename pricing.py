@@ -0,0 +1,154 @@
+import json
+import threading
+
+from models import Bill, Delivery
+
+# Shipping rates and cached bill totals.
+#
+# ShippingTable maps shipping methods to charges; unknown methods fall back
+# to the default one, as "anything but priority is standard" always did.
+# PricingEngine caches each bill's total and, once a dashboard first asks for
+# them, running totals per client and per delivery day. After that every
+# change is applied as a delta: new bills add, deleted orders subtract, and
+# only a shipping change or an inventory cost change recomputes the bills it
+# touches.
+
+class ShippingTable:
+    def __init__(self, rates: dict = None, default: str = "standard", urgent=("priority",)):
+        self.rates = dict(rates) if rates else {"priority": Delivery.PRIORITY_CHARGE,
+                                                "standard": Delivery.STANDARD_CHARGE}
+        if default not in self.rates:
+            raise ValueError(f"default shipping method {default!r} has no rate")
+        self.default = default
+        self.urgent = frozenset(urgent)  # Methods counted as urgent shipments
+
+    @classmethod
+    def from_file(cls, path: str):
+        # {"rates": {"priority": 6.5, "standard": 4.2, ...}, "default": "standard", "urgent": ["priority"]}
+        with open(path, "r") as f:
+            config = json.load(f)
+        return cls(config["rates"], config.get("default", "standard"), config.get("urgent", ("priority",)))
+
+    def method(self, name: str):
+        name = name.lower()
+        return name if name in self.rates else self.default
+
+    def charge(self, name: str):
+        return self.rates[self.method(name)]
+
+    def is_urgent(self, name: str):
+        return self.method(name) in self.urgent
+
+def _client_key(client):
+    return client.full_name, client.contact, client.email_address
+
+def _item_key(item):
+    return item.title, item.writer, item.cost
+
+class PricingEngine:
+    def __init__(self, table: ShippingTable = None):
+        self.table = table or ShippingTable()
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        # Forget everything, e.g. after the store is reloaded
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        # bill_id -> [cost, delivery_charge, client key, delivery date, item key, order_id]
+        self._entries = {}
+        self._by_item = {}  # item key -> {bill_id}
+        self._by_order = {}  # order_id -> {bill_id}
+        self._client_totals = None  # client key -> total; None until first built
+        self._day_totals = None  # delivery date -> total
+        self._grand_total = 0.0
+
+    @property
+    def aggregates_built(self):
+        return self._client_totals is not None
+
+    # Per-bill totals
+    def bill_total(self, bill: Bill):
+        entry = self._entries.get(bill.bill_id)
+        if entry is None:
+            entry = self._cache(bill)
+        bill.total_amount = entry[0] + entry[1]
+        return bill.total_amount
+
+    def _cache(self, bill: Bill):
+        purchase = bill.delivery.purchase
+        entry = [bill.inventory.cost, bill.delivery.delivery_charge, _client_key(purchase.client),
+                 bill.delivery.delivery_date, _item_key(bill.inventory), purchase.order_id]
+        with self._lock:
+            self._entries[bill.bill_id] = entry
+            self._by_item.setdefault(entry[4], set()).add(bill.bill_id)
+            self._by_order.setdefault(entry[5], set()).add(bill.bill_id)
+        return entry
+
+    # Running aggregates, read in O(1) once built
+    def build(self, bills):
+        with self._lock:
+            if self._client_totals is not None:
+                return
+            self._client_totals, self._day_totals, self._grand_total = {}, {}, 0.0
+            for bill in bills:
+                entry = self._entries.get(bill.bill_id) or self._cache(bill)
+                self._add(entry, entry[0] + entry[1])
+
+    def _add(self, entry, amount: float):
+        if self._client_totals is None:
+            return
+        self._client_totals[entry[2]] = self._client_totals.get(entry[2], 0.0) + amount
+        self._day_totals[entry[3]] = self._day_totals.get(entry[3], 0.0) + amount
+        self._grand_total += amount
+
+    def client_total(self, client):
+        return self._client_totals.get(_client_key(client), 0.0)
+
+    def day_total(self, day):
+        return self._day_totals.get(day, 0.0)
+
+    @property
+    def grand_total(self):
+        return self._grand_total
+
+    def day_totals(self):
+        return dict(self._day_totals)
+
+    # Change hooks, called by BookstoreManager under its write lock
+    def bills_added(self, bills):
+        with self._lock:
+            for bill in bills:
+                entry = self._cache(bill)
+                self._add(entry, entry[0] + entry[1])
+
+    def order_removed(self, order_id: str):
+        with self._lock:
+            for bill_id in self._by_order.pop(order_id, ()):
+                entry = self._entries.pop(bill_id)
+                self._by_item[entry[4]].discard(bill_id)
+                self._add(entry, -(entry[0] + entry[1]))
+
+    def shipping_changed(self, bill: Bill):
+        with self._lock:
+            entry = self._entries.get(bill.bill_id)
+            if entry is None:
+                return  # Not cached yet; its total is computed fresh when first read
+            charge = bill.delivery.delivery_charge
+            self._add(entry, charge - entry[1])
+            entry[1] = charge
+
+    def cost_changed(self, old_cost: float, item, get_bills):
+        # Only the bills at the item's old key are touched. Other items can share
+        # that key, so each bill's cost is read back through get_bills (the
+        # store's) rather than assumed to be the new one.
+        with self._lock:
+            bill_ids = self._by_item.pop((item.title, item.writer, old_cost), set())
+            for bill_id, bill in get_bills(bill_ids).items():
+                entry = self._entries[bill_id]
+                cost = bill.inventory.cost
+                self._add(entry, cost - entry[0])
+                entry[0], entry[4] = cost, _item_key(bill.inventory)
+                self._by_item.setdefault(entry[4], set()).add(bill_id)
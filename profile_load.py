@@ -0,0 +1,106 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+from storage import STORE_FORMAT_VERSION, JsonStore
+
+# Startup timing and peak memory for the JSON store loaders.
+#
+#   python profile_load.py --bills 200000
+#
+# Each loader runs in a fresh interpreter so its peak RSS is not polluted by
+# the others.
+LOADERS = {
+    "eager": {},
+    "streaming": {"streaming": True},
+    "streaming+lazy": {"streaming": True, "lazy_bills": True},
+}
+
+def build_store_data(bills: int, clients: int = None, items: int = None, seed: int = 0):
+    # Synthetic v2 snapshot with one open purchase per bill
+    rng = random.Random(seed)
+    clients = clients or max(1, bills // 10)
+    items = items or max(1, bills // 20)
+    order_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(bills)]
+    store_data = {
+        "version": STORE_FORMAT_VERSION,
+        "journal_seq": 0,
+        "clients": [
+            {"full_name": f"client {i}", "contact": f"{i:010d}", "email_address": f"client{i}@example.com"}
+            for i in range(clients)
+        ],
+        "items": [
+            {"title": f"book {i}", "writer": f"writer {i % 500}", "cost": round(rng.uniform(5, 120), 2)}
+            for i in range(items)
+        ],
+        "orders": [
+            {"order_id": order_id, "client": rng.randrange(clients), "item": rng.randrange(items)}
+            for order_id in order_ids
+        ],
+        "purchases": order_ids,
+    }
+    first_day = datetime.date(2021, 1, 1).toordinal()
+    store_data["bills"] = [
+        {
+            "bill_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "order_id": order["order_id"],
+            "item": order["item"],
+            "delivery_date": datetime.date.fromordinal(first_day + rng.randrange(1500)).isoformat(),
+            "delivery_charge": rng.choice((0.0, 4.2, 6.5)),
+        }
+        for order in store_data["orders"]
+    ]
+    return store_data
+
+def generate_store(path: str, bills: int, **kwargs):
+    with open(path, "w") as f:
+        json.dump(build_store_data(bills, **kwargs), f, indent=4)
+
+def measure(data_file: str, loader: str):
+    store = JsonStore(data_file, journal_file=os.devnull, **LOADERS[loader])
+    start = time.perf_counter()
+    store.load()
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+    return {
+        "loader": loader,
+        "load_seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_bytes / 2**20, 1),
+        "bills": len(store._bills),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON store loaders")
+    parser.add_argument("--data-file", default="profile_store.json")
+    parser.add_argument("--bills", type=int, default=100000,
+                        help="generate a synthetic store of this size if --data-file does not exist")
+    parser.add_argument("--loader", choices=LOADERS, help=argparse.SUPPRESS)  # Child process mode
+    args = parser.parse_args(argv)
+
+    if args.loader:
+        print(json.dumps(measure(args.data_file, args.loader)))
+        return
+
+    if not os.path.exists(args.data_file):
+        print(f"Generating {args.bills} bills into {args.data_file}...")
+        generate_store(args.data_file, args.bills)
+    size_mb = os.path.getsize(args.data_file) / 2**20
+    print(f"{args.data_file}: {size_mb:.1f} MB")
+    print(f"{'loader':<16}{'load s':>10}{'peak RSS MB':>14}")
+    for loader in LOADERS:
+        out = subprocess.run([sys.executable, __file__, "--data-file", args.data_file, "--loader", loader],
+                             check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(f"{loader:<16}{result['load_seconds']:>10.3f}{result['peak_rss_mb']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import bisect
+import random
+import time
+from collections import Counter
+
+from models import Inventory
+
+# Type-ahead search over inventory titles and writers.
+#
+# Prefix lookups bisect two sorted arrays of (folded text, item position), one
+# per field, so a keystroke costs O(log n + matches). Fuzzy lookups score items
+# by the character trigrams they share with the query, which tolerates typos
+# and transpositions. Both structures are extended in place as items are added.
+#
+#   python search.py --items 300000 "harry pottr"
+
+NGRAM_SIZE = 3
+FUZZY_MIN_SCORE = 0.5  # Fraction of the query's trigrams an item must contain
+FUZZY_CANDIDATES = 500  # Best-counted candidates re-scored against their full text
+
+def fold(text: str):
+    # Case-insensitive, whitespace-insensitive form used for every comparison
+    return " ".join(text.lower().split())
+
+def ngrams(text: str):
+    padded = f"  {fold(text)} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+class InventoryIndex:
+    def __init__(self, items=()):
+        self._items = []  # position -> Inventory
+        self._keys = {}  # (title, writer, cost) -> position, so re-adding an item is a no-op
+        self._titles = []  # sorted (folded title, position)
+        self._writers = []  # sorted (folded writer, position)
+        self._postings = {}  # trigram -> positions of the items containing it
+        # Bulk build: append everything, then sort each array once
+        for item in items:
+            position = self._append(item)
+            if position is not None:
+                self._titles.append((fold(item.title), position))
+                self._writers.append((fold(item.writer), position))
+        self._titles.sort()
+        self._writers.sort()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item: Inventory):
+        position = self._append(item)
+        if position is not None:
+            bisect.insort(self._titles, (fold(item.title), position))
+            bisect.insort(self._writers, (fold(item.writer), position))
+
+    def repriced(self, old_cost: float, item: Inventory):
+        # Titles and writers are unchanged, so only the cost and the dedupe key
+        # move. The entry is the item itself when the store hands out its own
+        # objects; backends like SQLite hand out copies, so then it is the first
+        # copy still at the old cost, and that copy is repriced too.
+        wanted = fold(item.title)
+        i = bisect.bisect_left(self._titles, (wanted,))
+        same_title = []
+        while i < len(self._titles) and self._titles[i][0] == wanted:
+            same_title.append(self._titles[i][1])
+            i += 1
+        position = next((p for p in same_title if self._items[p] is item), None)
+        if position is None:
+            position = next((p for p in same_title
+                             if self._items[p].writer == item.writer and self._items[p].cost == old_cost), None)
+            if position is None:
+                return
+            self._items[position].cost = item.cost
+        old_key = (item.title, item.writer, old_cost)
+        if self._keys.get(old_key) == position:
+            del self._keys[old_key]
+        self._keys.setdefault((item.title, item.writer, item.cost), position)
+
+    def _append(self, item: Inventory):
+        key = (item.title, item.writer, item.cost)
+        if key in self._keys:
+            return None
+        position = self._keys[key] = len(self._items)
+        self._items.append(item)
+        for gram in ngrams(item.title) | ngrams(item.writer):
+            self._postings.setdefault(gram, []).append(position)
+        return position
+
+    def _prefix_positions(self, keys: list, prefix: str):
+        i = bisect.bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def prefix(self, query: str, limit: int = 10):
+        # Titles starting with the query first, then writers
+        prefix = fold(query)
+        if not prefix:
+            return []
+        found = {}
+        for keys in (self._titles, self._writers):
+            for position in self._prefix_positions(keys, prefix):
+                if len(found) >= limit:
+                    break
+                found.setdefault(position, self._items[position])
+        return list(found.values())
+
+    def fuzzy(self, query: str, limit: int = 10):
+        query_grams = ngrams(query)
+        if not query_grams:
+            return []
+        # An item holding FUZZY_MIN_SCORE of the query's trigrams must hold at
+        # least one of its rarest (n - needed + 1), so only those postings are
+        # counted; the best candidates are then scored on their full trigram set.
+        needed = max(1, round(len(query_grams) * FUZZY_MIN_SCORE))
+        rarest = sorted(query_grams, key=lambda gram: len(self._postings.get(gram, ())))
+        counts = Counter()
+        for gram in rarest[:len(query_grams) - needed + 1]:
+            counts.update(self._postings.get(gram, ()))
+
+        scored = []
+        for position, _ in counts.most_common(FUZZY_CANDIDATES):
+            item = self._items[position]
+            item_grams = ngrams(item.title) | ngrams(item.writer)
+            shared = len(query_grams & item_grams)
+            if shared >= needed:
+                # Containment of the query first, then the closer overall length
+                scored.append((-shared / len(query_grams), len(item_grams), position))
+        scored.sort()
+        return [self._items[position] for _, _, position in scored[:limit]]
+
+    def search(self, query: str, limit: int = 10):
+        # Prefix matches, topped up with fuzzy matches when there are too few
+        results = self.prefix(query, limit)
+        if len(results) < limit:
+            seen = {id(item) for item in results}
+            for item in self.fuzzy(query, limit):
+                if len(results) >= limit:
+                    break
+                if id(item) not in seen:
+                    seen.add(id(item))
+                    results.append(item)
+        return results
+
+    def match_title(self, title: str):
+        # The first item whose title equals this one ignoring case and spacing
+        wanted = fold(title)
+        i = bisect.bisect_left(self._titles, (wanted,))
+        if i < len(self._titles) and self._titles[i][0] == wanted:
+            return self._items[self._titles[i][1]]
+        return None
+
+WORDS = ("the", "of", "and", "night", "garden", "river", "stone", "shadow", "winter", "house", "secret",
+         "king", "city", "light", "last", "lost", "song", "glass", "iron", "summer", "dark", "storm")
+
+def synthetic_items(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f" {i}"
+        yield Inventory(title.title(), f"Writer {rng.randrange(count // 20 + 1)}", round(rng.uniform(5, 120), 2))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time inventory prefix and fuzzy search")
+    parser.add_argument("query", nargs="*", default=["the los", "shadw of the kng", "writer 12"])
+    parser.add_argument("--items", type=int, default=300000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    items = list(synthetic_items(args.items))
+    start = time.perf_counter()
+    index = InventoryIndex(items)
+    print(f"Indexed {len(index)} items in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    index.add(Inventory("A Late Addition", "Someone New", 9.99))
+    print(f"Incremental add: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    for query in args.query:
+        # Time every keystroke of the query as it is typed
+        timings = []
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            results = index.search(query[:end], args.limit)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"\n{query!r}: worst keystroke {max(timings):.2f} ms, mean {sum(timings) / len(timings):.2f} ms")
+        for item in results:
+            print(f"  {item.title} by {item.writer}")
+
+if __name__ == "__main__":
+    main()
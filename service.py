@@ -0,0 +1,277 @@
+import argparse
+import datetime
+import json
+import re
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from main import BookstoreManager
+from metrics import Metrics
+from models import Client, Inventory, Purchase
+from pricing import PricingEngine, ShippingTable
+from storage import open_store
+from validation import validate_client, validate_item
+
+# Headless HTTP/JSON front for BookstoreManager.
+#
+#   python service.py [--host 127.0.0.1] [--port 8080] [--db store.db | store_dir/] [--shipping-rates rates.json]
+#
+#   POST   /clients               {"full_name", "contact", "email_address"}
+#   POST   /inventory             {"title", "writer", "cost"}
+#   GET    /inventory?q=dun       type-ahead search
+#   POST   /purchases             {"client", "title"} -> {"order_id"}
+#   POST   /bills                 {"order_id"} -> bill
+#   GET    /bills/<bill_id>
+#   POST   /bills/<bill_id>/shipping  {"method": "priority" | "standard" | any method in --shipping-rates}
+#   GET    /totals?day=2025-01-31 billed totals, overall and for the day
+#   DELETE /orders/<order_id>
+#   GET    /metrics               Prometheus text, when started with --metrics
+#
+# Requests are parsed and answered on the server's handler threads, but every
+# manager call is queued to one writer thread, so the manager (and a SQLite
+# connection) is only ever touched by a single thread.
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def bill_to_dict(bill, total: float):
+    delivery = bill.delivery
+    return {
+        "bill_id": bill.bill_id,
+        "order_id": delivery.purchase.order_id,
+        "client": delivery.purchase.client.full_name,
+        "title": bill.inventory.title,
+        "writer": bill.inventory.writer,
+        "cost": bill.inventory.cost,
+        "delivery_date": delivery.delivery_date.isoformat(),
+        "delivery_charge": delivery.delivery_charge,
+        "total": total,
+    }
+
+def require(body: dict, *fields):
+    missing = [field for field in fields if field not in body]
+    if missing:
+        raise ServiceError(400, f"missing field(s): {', '.join(missing)}")
+    return [body[field] for field in fields]
+
+def validated(validate, body: dict, *fields, numbers=()):
+    # The fields cleaned by one of the validation module's checks, as a 400 on
+    # bad input. Those checks expect strings outside numbers, so that comes first.
+    values = require(body, *fields)
+    for field, value in zip(fields, values):
+        if field not in numbers and not isinstance(value, str):
+            raise ServiceError(400, f"{field} must be a string")
+    try:
+        return validate(*values)
+    except ValueError as e:
+        raise ServiceError(400, str(e))
+
+class BookstoreService:
+    # The operations behind the routes; each runs on the writer thread
+    def __init__(self, manager: BookstoreManager):
+        self.manager = manager
+
+    def add_client(self, body):
+        full_name, contact, email_address = validated(validate_client, body, "full_name", "contact", "email_address")
+        client = self.manager.add_client(Client(full_name, contact, email_address))
+        return 201, {"full_name": client.full_name}
+
+    def add_inventory(self, body):
+        title, writer, cost = validated(validate_item, body, "title", "writer", "cost", numbers=("cost",))
+        item = self.manager.add_inventory(Inventory(title, writer, cost))
+        return 201, {"title": item.title, "writer": item.writer, "cost": item.cost}
+
+    def search_inventory(self, query):
+        try:
+            limit = int(query.get("limit", ["10"])[0])
+        except ValueError:
+            raise ServiceError(400, "limit must be an integer")
+        if limit < 0:
+            raise ServiceError(400, "limit must not be negative")
+        items = self.manager.search_items(query.get("q", [""])[0], limit)
+        return 200, [{"title": item.title, "writer": item.writer, "cost": item.cost} for item in items]
+
+    def add_purchase(self, body):
+        client_name, title = require(body, "client", "title")
+        client = self.manager.find_client(client_name)
+        if client is None:
+            raise ServiceError(404, "client not found")
+        item = self.manager.resolve_item(title)
+        if item is None:
+            raise ServiceError(404, "inventory item not found")
+        purchase = self.manager.add_purchase(Purchase(client, item))
+        return 201, {"order_id": purchase.order_id}
+
+    def generate_bill(self, body):
+        order_id, = require(body, "order_id")
+        bill = self.manager.generate_bill(order_id)
+        if bill is None:
+            raise ServiceError(404, "order not found")
+        return 201, bill_to_dict(bill, self.manager.bill_total(bill.bill_id))
+
+    # Quiet manager calls; locate_bill, integrate_shipping and delete_order_by_id print to the console
+    def locate_bill(self, bill_id):
+        bill = self.manager.get_bill(bill_id)
+        if bill is None:
+            raise ServiceError(404, "bill not found")
+        return 200, bill_to_dict(bill, self.manager.bill_total(bill_id))
+
+    def apply_shipping(self, bill_id, body):
+        method = body.get("method", "standard")
+        if not isinstance(method, str):
+            raise ServiceError(400, "method must be a string")
+        result, = self.manager.apply_shipping_bulk({bill_id: method})
+        if result["status"] != "shipped":
+            raise ServiceError(404, "bill not found")
+        return self.locate_bill(bill_id)
+
+    def delete_order(self, order_id):
+        if not self.manager.remove_order(order_id):
+            raise ServiceError(404, "order not found")
+        return 200, {"order_id": order_id, "deleted": True}
+
+    def totals(self, query):
+        payload = {"total": round(self.manager.grand_total(), 2)}
+        if "day" in query:
+            try:
+                day = datetime.date.fromisoformat(query["day"][0])
+            except ValueError:
+                raise ServiceError(400, "day must be YYYY-MM-DD")
+            payload["day"] = {"date": day.isoformat(), "total": round(self.manager.day_total(day), 2)}
+        return 200, payload
+
+ROUTES = [
+    ("POST", re.compile(r"/clients"), lambda service, body, query: service.add_client(body)),
+    ("POST", re.compile(r"/inventory"), lambda service, body, query: service.add_inventory(body)),
+    ("GET", re.compile(r"/inventory"), lambda service, body, query: service.search_inventory(query)),
+    ("POST", re.compile(r"/purchases"), lambda service, body, query: service.add_purchase(body)),
+    ("POST", re.compile(r"/bills"), lambda service, body, query: service.generate_bill(body)),
+    ("GET", re.compile(r"/bills/([^/]+)"), lambda service, body, query, bill_id: service.locate_bill(bill_id)),
+    ("POST", re.compile(r"/bills/([^/]+)/shipping"),
+     lambda service, body, query, bill_id: service.apply_shipping(bill_id, body)),
+    ("DELETE", re.compile(r"/orders/([^/]+)"), lambda service, body, query, order_id: service.delete_order(order_id)),
+    ("GET", re.compile(r"/totals"), lambda service, body, query: service.totals(query)),
+]
+
+class BookstoreHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so load generators can reuse connections
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method: str):
+        try:
+            url = urlsplit(self.path)
+            if method == "GET" and url.path == "/metrics":
+                return self.send_metrics()
+            body = self.read_body()
+            for route_method, pattern, action in ROUTES:
+                match = pattern.fullmatch(url.path)
+                if match and route_method == method:
+                    break
+            else:
+                raise ServiceError(404, f"no route for {method} {url.path}")
+            # Handler threads wait here while the writer thread runs the call
+            future = self.server.writer.submit(action, self.server.service, body, parse_qs(url.query), *match.groups())
+            status, payload = future.result()
+        except ServiceError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        self.send_json(status, payload)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ServiceError(400, "request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise ServiceError(400, "request body must be a JSON object")
+        return body
+
+    def send_json(self, status: int, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_metrics(self):
+        metrics = self.server.service.manager.metrics
+        if metrics is None:
+            return self.send_json(404, {"error": "metrics are disabled; start with --metrics"})
+        data = metrics.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class BookstoreServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, manager_factory, verbose: bool = False):
+        super().__init__(address, BookstoreHandler)
+        self.verbose = verbose
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bookstore-writer")
+        # The manager is created and loaded on the writer thread, like every
+        # later call; loading before serving keeps it out of the first request
+        self.service = self.writer.submit(lambda: BookstoreService(manager_factory())).result()
+        self.writer.submit(self.service.manager.load_store_data).result()
+
+    def server_close(self):
+        super().server_close()
+        self.writer.submit(self.service.manager.close).result()
+        self.writer.shutdown()
+
+def stop_serving(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve BookstoreManager over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", help="SQLite file, sharded store directory or .json snapshot instead of store_data.json")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    parser.add_argument("--metrics", action="store_true", help="record manager metrics and serve GET /metrics")
+    parser.add_argument("--shipping-rates", metavar="JSON", help="shipping table to use instead of the built-in rates")
+    args = parser.parse_args(argv)
+
+    metrics = Metrics() if args.metrics else None
+    table = ShippingTable.from_file(args.shipping_rates) if args.shipping_rates else None
+    server = BookstoreServer((args.host, args.port),
+                             lambda: BookstoreManager(open_store(args.db) if args.db else None, metrics,
+                                                      PricingEngine(table)),
+                             args.verbose)
+    signal.signal(signal.SIGTERM, stop_serving)  # Close the store cleanly under process managers too
+    print(f"Serving on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
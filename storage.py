@@ -0,0 +1,1373 @@
+import datetime
+import json  # JSON support
+import os
+import re
+import sqlite3
+import threading
+
+from browse import BillView, memory_bill_view, ordered
+from models import Client, Inventory, Purchase, Delivery, Bill
+
+STORE_FORMAT_VERSION = 2  # On-disk layout written by JsonStore.save
+JOURNAL_COMPACT_THRESHOLD = 1000  # Journal records before close() rewrites the snapshot
+
+# Append-only log of store mutations, one JSON record per line
+class Journal:
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = 0  # Records appended since the last snapshot
+        self._file = None
+        self._torn_tail = None  # (offset, suffix) that repairs a torn final record
+
+    def append(self, record: dict):
+        self.extend([record])
+
+    def extend(self, records: list):
+        # One write and one flush for the whole batch
+        if not records:
+            return
+        if self._file is None:
+            self._repair_tail()
+            self._file = open(self.path, "a")
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._file.flush()
+        self.entries += len(records)
+
+    def replay(self):
+        # Reads only. A crash mid-append can leave the last line torn or without
+        # its newline; replay notes where it starts and the first append repairs it.
+        # Unreadable lines earlier in the file are skipped, not cut off.
+        self._torn_tail = None
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            bad = None  # (line number, offset) of the latest unreadable line
+            for number, line in enumerate(f, 1):
+                start, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                if bad is not None:
+                    print(f"Skipping unreadable journal line {bad[0]}")
+                    bad = None
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    bad = (number, start)
+                    continue
+                if not line.endswith(b"\n"):
+                    self._torn_tail = (offset, b"\n")  # Complete record whose newline never made it
+                self.entries += 1
+                yield record
+            if bad is not None:
+                self._torn_tail = (bad[1], b"")
+
+    def _repair_tail(self):
+        # Devices such as /dev/null can be neither truncated nor repaired
+        if self._torn_tail is None or not os.path.isfile(self.path):
+            return
+        offset, suffix = self._torn_tail
+        with open(self.path, "rb+") as f:
+            f.truncate(offset)
+            f.seek(offset)
+            f.write(suffix)
+        self._torn_tail = None
+
+    def reset(self):
+        self.close()
+        open(self.path, "w").close()
+        self.entries = 0
+        self._torn_tail = None
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+# Storage backends. BookstoreManager keeps the business rules and talks to
+# whichever backend it was given through the methods below.
+class StoreBackend:
+    @property
+    def clients(self):
+        raise NotImplementedError
+
+    @property
+    def items(self):
+        raise NotImplementedError
+
+    @property
+    def purchases(self):
+        raise NotImplementedError
+
+    @property
+    def bills(self):
+        raise NotImplementedError
+
+    def load(self):
+        raise NotImplementedError
+
+    def save(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def stored_bytes(self):
+        # Size of everything the backend keeps on disk
+        raise NotImplementedError
+
+    def add_client(self, client: Client):
+        raise NotImplementedError
+
+    def add_item(self, item: Inventory):
+        raise NotImplementedError
+
+    def add_purchase(self, purchase: Purchase):
+        raise NotImplementedError
+
+    def add_bill(self, bill: Bill):
+        raise NotImplementedError
+
+    def update_delivery_charge(self, bill: Bill):
+        raise NotImplementedError
+
+    def update_item_cost(self, item: Inventory, cost: float):
+        # Reprices an existing item; bills refer to the item, so their totals follow
+        raise NotImplementedError
+
+    def remove_purchase(self, purchase: Purchase):
+        raise NotImplementedError
+
+    def find_client(self, full_name: str):
+        raise NotImplementedError
+
+    def find_item(self, title: str):
+        raise NotImplementedError
+
+    def get_purchase(self, order_id: str):
+        raise NotImplementedError
+
+    def find_purchase_by_title(self, title: str):
+        raise NotImplementedError
+
+    def get_bill(self, bill_id: str):
+        raise NotImplementedError
+
+    # Batch variants used for bulk billing and shipping. These fall back to one
+    # call per record; backends override them when they can do better.
+    def get_purchases(self, order_ids):
+        found = {}
+        for order_id in order_ids:
+            purchase = self.get_purchase(order_id)
+            if purchase is not None:
+                found[order_id] = purchase
+        return found
+
+    def get_bills(self, bill_ids):
+        found = {}
+        for bill_id in bill_ids:
+            bill = self.get_bill(bill_id)
+            if bill is not None:
+                found[bill_id] = bill
+        return found
+
+    def add_clients(self, clients):
+        return [self.add_client(client) for client in clients]
+
+    def add_items(self, items):
+        return [self.add_item(item) for item in items]
+
+    def add_bills(self, bills):
+        for bill in bills:
+            self.add_bill(bill)
+
+    def bills_since(self, day: datetime.date):
+        # Bills delivered on or after day, oldest first; used by incremental exports
+        return [bill for bill in self.bills if bill.delivery.delivery_date >= day]
+
+    def update_delivery_charges(self, bills):
+        for bill in bills:
+            self.update_delivery_charge(bill)
+
+    def bill_view(self, sort: str = "date", descending: bool = False, field: str = None, text: str = ""):
+        # Sorted, filtered snapshot for list views (see browse.py)
+        return memory_bill_view(self.bills, sort, descending, field, text)
+
+# Snapshot readers. Both yield (section, value) pairs: one pair per element of
+# the top-level arrays and one for each top-level scalar such as "version".
+def iter_store_dict(store_data: dict):
+    for section, value in store_data.items():
+        if isinstance(value, list):
+            for record in value:
+                yield section, record
+        else:
+            yield section, value
+
+STREAM_CHUNK_SIZE = 1 << 20  # Characters read per refill by iter_store_records
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")  # What a number cut at a chunk boundary may continue with
+
+def iter_store_records(f, chunk_size: int = STREAM_CHUNK_SIZE):
+    # Incremental parser for the snapshot layout: only the current chunk and
+    # the record being decoded are held in memory, never the whole document.
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def peek(allowed):
+        skip_ws()
+        if pos >= len(buf) or buf[pos] not in allowed:
+            raise ValueError(f"Malformed store file: expected one of {allowed!r}")
+        return buf[pos]
+
+    def decode():
+        nonlocal pos
+        while True:
+            skip_ws()
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()  # The value runs past the end of this chunk
+                continue
+            if not eof and NUMBER_TAIL.fullmatch(buf, end):
+                # A number may continue in the next chunk: raw_decode reads
+                # "1." or "2e-" at the end of the buffer as just 1 or 2
+                fill()
+                continue
+            pos = end
+            return value
+
+    peek("{")
+    pos += 1
+    if peek('"}') == "}":
+        return
+    while True:
+        section = decode()
+        peek(":")
+        pos += 1
+        skip_ws()
+        if pos < len(buf) and buf[pos] == "[":
+            pos += 1
+            skip_ws()
+            if pos < len(buf) and buf[pos] == "]":
+                pos += 1
+            else:
+                while True:
+                    yield section, decode()
+                    sep = peek(",]")
+                    pos += 1
+                    if sep == "]":
+                        break
+        else:
+            yield section, decode()
+        sep = peek(",}")
+        pos += 1
+        if sep == "}":
+            return
+
+# Default backend: everything in memory behind hash indexes, persisted as a
+# JSON snapshot plus an append-only journal of changes since that snapshot.
+class JsonStore(StoreBackend):
+    def __init__(self, data_file: str = "store_data.json", journal_file: str = "store_journal.jsonl",
+                 streaming: bool = False, lazy_bills: bool = False):
+        self.data_file = data_file
+        self.journal = Journal(journal_file)
+        self.streaming = streaming  # Parse the snapshot record by record instead of json.load
+        self.lazy_bills = lazy_bills  # Build Bill/Delivery objects on first access
+        self._journal_seq = 0  # Sequence number of the last applied journal record
+
+        self._clients = []
+        self._items = []
+        self._purchases = {}  # order_id -> Purchase
+        self._bills = {}  # bill_id -> Bill, or its loaded fields until first access
+        self._materialize_lock = threading.Lock()
+
+        # Lookup indexes, kept in sync by the _register/_remove methods below
+        self._client_ids = {}  # id(Client) -> position in self._clients
+        self._item_ids = {}  # id(Inventory) -> position in self._items
+        self._client_keys = {}  # (full_name, contact, email_address) -> Client
+        self._item_keys = {}  # (title, writer, cost) -> Inventory
+        self._dates = {}  # ISO date -> datetime.date, shared by every bill on that day
+        self._clients_by_name = {}
+        self._items_by_title = {}
+        self._purchases_by_title = {}  # lowercased title -> {order_id: Purchase}
+        self._bills_by_order = {}  # order_id -> [bill_id, ...]
+
+    @property
+    def clients(self):
+        return self._clients
+
+    @property
+    def items(self):
+        return self._items
+
+    @property
+    def purchases(self):
+        return list(self._purchases.values())
+
+    @property
+    def bills(self):
+        return [self._bill(bill_id) for bill_id in self._bills]
+
+    # Mutations, each recorded in the journal as it happens
+    def add_client(self, client: Client):
+        existing = self._client_keys.get((client.full_name, client.contact, client.email_address))
+        if existing is not None:
+            return existing
+        self._register_client(client)
+        self._log("add_client", full_name=client.full_name, contact=client.contact,
+                  email_address=client.email_address)
+        return client
+
+    def add_item(self, item: Inventory):
+        existing = self._item_keys.get((item.title, item.writer, item.cost))
+        if existing is not None:
+            return existing
+        self._register_item(item)
+        self._log("add_inventory", title=item.title, writer=item.writer, cost=item.cost)
+        return item
+
+    def add_clients(self, clients):
+        added, records = [], []
+        for client in clients:
+            existing = self._client_keys.get((client.full_name, client.contact, client.email_address))
+            if existing is None:
+                existing = self._register_client(client)
+                records.append({"op": "add_client", "full_name": client.full_name, "contact": client.contact,
+                                "email_address": client.email_address})
+            added.append(existing)
+        self._log_many(records)
+        return added
+
+    def add_items(self, items):
+        added, records = [], []
+        for item in items:
+            existing = self._item_keys.get((item.title, item.writer, item.cost))
+            if existing is None:
+                existing = self._register_item(item)
+                records.append({"op": "add_inventory", "title": item.title, "writer": item.writer, "cost": item.cost})
+            added.append(existing)
+        self._log_many(records)
+        return added
+
+    def add_purchase(self, purchase: Purchase):
+        if id(purchase.client) not in self._client_ids:
+            purchase.client = self.add_client(purchase.client)
+        if id(purchase.inventory) not in self._item_ids:
+            purchase.inventory = self.add_item(purchase.inventory)
+        self._register_purchase(purchase)
+        self._log("add_purchase", order_id=purchase.order_id,
+                  client=self._client_ids[id(purchase.client)],
+                  item=self._item_ids[id(purchase.inventory)])
+        return purchase
+
+    def add_bill(self, bill: Bill):
+        self.add_bills([bill])
+        return bill
+
+    def add_bills(self, bills):
+        for bill in bills:
+            self._register_bill(bill)
+        self._log_many([
+            {"op": "generate_bill", "order_id": bill.delivery.purchase.order_id, "bill_id": bill.bill_id,
+             "delivery_date": bill.delivery.delivery_date.isoformat()}
+            for bill in bills
+        ])
+
+    def update_delivery_charge(self, bill: Bill):
+        self.update_delivery_charges([bill])
+
+    def update_delivery_charges(self, bills):
+        self._log_many([
+            {"op": "apply_shipping", "bill_id": bill.bill_id, "delivery_charge": bill.delivery.delivery_charge}
+            for bill in bills
+        ])
+
+    def update_item_cost(self, item: Inventory, cost: float):
+        # item is this store's own object (from find_item); another item may
+        # share its old key, so it is not looked up again by that key
+        self._set_item_cost(item, cost)
+        self._log("update_cost", item=self._item_ids[id(item)], cost=cost)
+        return item
+
+    def remove_purchase(self, purchase: Purchase):
+        self._remove_purchase(purchase)
+        self._log("delete_order", order_id=purchase.order_id)
+
+    def _log(self, op: str, **fields):
+        self._log_many([{"op": op, **fields}])
+
+    def _log_many(self, records: list):
+        for record in records:
+            self._journal_seq += 1
+            record["seq"] = self._journal_seq
+        self.journal.extend(records)
+
+    # Index maintenance. Identical clients and items are interned, so each
+    # distinct record is held once however many orders refer to it.
+    def _register_client(self, client: Client):
+        self._client_keys[(client.full_name, client.contact, client.email_address)] = client
+        self._client_ids[id(client)] = len(self._clients)
+        self._clients.append(client)
+        self._clients_by_name.setdefault(client.full_name, client)
+        return client
+
+    def _register_item(self, item: Inventory):
+        self._item_keys[(item.title, item.writer, item.cost)] = item
+        self._item_ids[id(item)] = len(self._items)
+        self._items.append(item)
+        self._items_by_title.setdefault(item.title, item)
+        return item
+
+    def _set_item_cost(self, item: Inventory, cost: float):
+        key = (item.title, item.writer, item.cost)
+        if self._item_keys.get(key) is item:
+            del self._item_keys[key]
+        item.cost = cost
+        self._item_keys.setdefault((item.title, item.writer, cost), item)
+
+    def _intern_client(self, data: dict):
+        key = (data["full_name"], data["contact"], data["email_address"])
+        client = self._client_keys.get(key)
+        return client if client is not None else self._register_client(Client(*key))
+
+    def _intern_item(self, data: dict):
+        key = (data["title"], data["writer"], data["cost"])
+        item = self._item_keys.get(key)
+        return item if item is not None else self._register_item(Inventory(*key))
+
+    def _date(self, iso_date: str):
+        date = self._dates.get(iso_date)
+        if date is None:
+            date = self._dates[iso_date] = datetime.date.fromisoformat(iso_date)
+        return date
+
+    def _register_purchase(self, purchase: Purchase):
+        self._purchases[purchase.order_id] = purchase
+        title_key = purchase.inventory.title.lower()
+        self._purchases_by_title.setdefault(title_key, {})[purchase.order_id] = purchase
+        return purchase
+
+    def _register_bill(self, bill: Bill):
+        self._bills[bill.bill_id] = bill
+        self._bills_by_order.setdefault(bill.delivery.purchase.order_id, []).append(bill.bill_id)
+        return bill
+
+    def _register_loaded_bill(self, bill_id, purchase, item, delivery_date, delivery_charge):
+        delivery_date = self._date(delivery_date)
+        if self.lazy_bills:
+            self._bills[bill_id] = (purchase, item, delivery_date, delivery_charge)
+            self._bills_by_order.setdefault(purchase.order_id, []).append(bill_id)
+        else:
+            self._register_bill(self._build_bill(bill_id, purchase, item, delivery_date, delivery_charge))
+
+    def _build_bill(self, bill_id, purchase, item, delivery_date, delivery_charge):
+        delivery = Delivery(purchase, delivery_date)
+        delivery.update_delivery_charge(delivery_charge)
+        return Bill(bill_id, item, delivery)
+
+    def _bill(self, bill_id: str):
+        bill = self._bills.get(bill_id)
+        if type(bill) is tuple:
+            # Concurrent readers may race to materialize the same bill; only
+            # one Bill object may ever be stored for it
+            with self._materialize_lock:
+                bill = self._bills.get(bill_id)
+                if type(bill) is tuple:
+                    bill = self._bills[bill_id] = self._build_bill(bill_id, *bill)
+        return bill
+
+    def _remove_purchase(self, purchase: Purchase):
+        del self._purchases[purchase.order_id]
+        title_key = purchase.inventory.title.lower()
+        same_title = self._purchases_by_title[title_key]
+        del same_title[purchase.order_id]
+        if not same_title:
+            del self._purchases_by_title[title_key]
+        # Drop every bill raised for this order along with it
+        for bill_id in self._bills_by_order.pop(purchase.order_id, []):
+            del self._bills[bill_id]
+
+    # Lookups
+    def find_client(self, full_name: str):
+        return self._clients_by_name.get(full_name)
+
+    def find_item(self, title: str):
+        return self._items_by_title.get(title)
+
+    def get_purchase(self, order_id: str):
+        return self._purchases.get(order_id)
+
+    def find_purchase_by_title(self, title: str):
+        same_title = self._purchases_by_title.get(title.lower())
+        return next(iter(same_title.values())) if same_title else None
+
+    def get_bill(self, bill_id: str):
+        return self._bill(bill_id)
+
+    def bills_since(self, day: datetime.date):
+        # Bills are kept in creation order and dated the day they are raised,
+        # so walk back from the newest and stop at the first older one.
+        recent = []
+        for bill_id in reversed(self._bills):
+            bill = self._bills[bill_id]
+            delivery_date = bill[2] if type(bill) is tuple else bill.delivery.delivery_date
+            if delivery_date < day:
+                break
+            recent.append(bill_id)
+        return [self._bill(bill_id) for bill_id in reversed(recent)]
+
+    # Persistence
+    def save(self):
+        # Version 2 layout: every client, item and order is written once and
+        # purchases/bills refer to them by ID (their position in the list).
+        clients, client_ids = [], {}
+        items, item_ids = [], {}
+        orders, order_ids = [], {}
+
+        def client_ref(client):
+            if id(client) not in client_ids:
+                client_ids[id(client)] = len(clients)
+                clients.append({
+                    "full_name": client.full_name,
+                    "contact": client.contact,
+                    "email_address": client.email_address
+                })
+            return client_ids[id(client)]
+
+        def item_ref(item):
+            if id(item) not in item_ids:
+                item_ids[id(item)] = len(items)
+                items.append({
+                    "title": item.title,
+                    "writer": item.writer,
+                    "cost": item.cost
+                })
+            return item_ids[id(item)]
+
+        def order_ref(purchase):
+            if purchase.order_id not in order_ids:
+                order_ids[purchase.order_id] = len(orders)
+                orders.append({
+                    "order_id": purchase.order_id,
+                    "client": client_ref(purchase.client),
+                    "item": item_ref(purchase.inventory)
+                })
+            return purchase.order_id
+
+        for client in self._clients:
+            client_ref(client)
+        for item in self._items:
+            item_ref(item)
+
+        # Resolve purchases and bills first so any client, item or order they
+        # reference is registered before the tables are written out.
+        purchases = [order_ref(purchase) for purchase in self._purchases.values()]
+        bills = []
+        for bill_id, bill in self._bills.items():
+            if type(bill) is tuple:  # Never accessed since loading; write its fields back as-is
+                purchase, item, delivery_date, delivery_charge = bill
+                delivery_date = delivery_date.isoformat()
+            else:
+                purchase, item = bill.delivery.purchase, bill.inventory
+                delivery_date = bill.delivery.delivery_date.isoformat()
+                delivery_charge = bill.delivery.delivery_charge
+            bills.append({
+                "bill_id": bill_id,
+                "order_id": order_ref(purchase),
+                "item": item_ref(item),
+                "delivery_date": delivery_date,
+                "delivery_charge": delivery_charge
+            })
+        store_data = {
+            "version": STORE_FORMAT_VERSION,
+            "journal_seq": self._journal_seq,
+            "clients": clients,
+            "items": items,
+            "orders": orders,
+            "purchases": purchases,
+            "bills": bills
+        }
+        # Write the snapshot next to the old one and swap it in atomically, so a
+        # crash mid-save never leaves a half-written store behind.
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(store_data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        # Everything journaled so far is now part of the snapshot
+        self.journal.reset()
+
+    def close(self):
+        # Fold the journal into a fresh snapshot once it has grown large enough;
+        # otherwise the journal already holds every change and nothing is rewritten.
+        if self.journal.entries >= JOURNAL_COMPACT_THRESHOLD:
+            self.save()
+        self.journal.close()
+
+    def stored_bytes(self):
+        return _file_sizes(self.data_file, self.journal.path)
+
+    def load(self):
+        try:
+            with open(self.data_file, "r") as f:
+                if self.streaming:
+                    self._load_records(iter_store_records(f))
+                else:
+                    self._load_records(iter_store_dict(json.load(f)))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading data: {e}")
+        self.replay_journal()  # Re-apply changes made since that snapshot
+
+    def _load_records(self, records):
+        # Records arrive one at a time as (section, value) pairs. The v2 layout
+        # refers to clients, items and orders by position; the old nested layout
+        # carries full copies in every purchase and bill, which are interned so
+        # each record is built once.
+        version = 1
+        clients, items, orders = [], [], {}
+
+        def intern_order(data):
+            purchase = orders.get(data["order_id"])
+            if purchase is None:
+                purchase = orders[data["order_id"]] = Purchase(
+                    self._intern_client(data["client"]), self._intern_item(data["inventory"]), data["order_id"])
+            return purchase
+
+        for section, record in records:
+            if section == "version":
+                version = record
+            elif section == "journal_seq":
+                self._journal_seq = record
+            elif section == "clients":
+                clients.append(self._intern_client(record))
+            elif section == "items":
+                items.append(self._intern_item(record))
+            elif section == "orders":
+                orders[record["order_id"]] = Purchase(clients[record["client"]], items[record["item"]],
+                                                      record["order_id"])
+            elif section == "purchases":
+                self._register_purchase(orders[record] if version >= 2 else intern_order(record))
+            elif section == "bills":
+                if version >= 2:
+                    self._register_loaded_bill(record["bill_id"], orders[record["order_id"]], items[record["item"]],
+                                               record["delivery_date"], record["delivery_charge"])
+                else:
+                    delivery_data = record["delivery"]
+                    self._register_loaded_bill(record["bill_id"], intern_order(delivery_data["purchase"]),
+                                               self._intern_item(record["inventory"]), delivery_data["delivery_date"],
+                                               delivery_data["delivery_charge"])
+
+    def replay_journal(self):
+        for record in self.journal.replay():
+            if record["seq"] <= self._journal_seq:
+                continue  # Already folded into the snapshot
+            self._journal_seq = record["seq"]
+            try:
+                self._apply_journal_record(record)
+            except (KeyError, IndexError) as e:
+                print(f"Skipping journal record {record['seq']}: {e}")
+
+    def _apply_journal_record(self, record):
+        op = record["op"]
+        if op == "add_client":
+            self._intern_client(record)
+        elif op == "add_inventory":
+            self._intern_item(record)
+        elif op == "add_purchase":
+            self._register_purchase(Purchase(self._clients[record["client"]], self._items[record["item"]],
+                                             record["order_id"]))
+        elif op == "generate_bill":
+            purchase = self._purchases[record["order_id"]]
+            self._register_bill(self._build_bill(record["bill_id"], purchase, purchase.inventory,
+                                                 self._date(record["delivery_date"]), 0.0))
+        elif op == "apply_shipping":
+            self._bill(record["bill_id"]).delivery.update_delivery_charge(record["delivery_charge"])
+        elif op == "update_cost":
+            self._set_item_cost(self._items[record["item"]], record["cost"])
+        elif op == "delete_order":
+            self._remove_purchase(self._purchases[record["order_id"]])
+
+# Partitioned variant of JsonStore for long histories. Clients and items live
+# in base.json; bills go to one file per delivery month (2025-01.json, ...)
+# together with the orders they refer to, and each open purchase is listed in
+# the month of its newest bill, or in unbilled.json until it is billed.
+# manifest.json names the partitions and the journal position they include.
+#
+# Only base, unbilled and the newest hot_months partitions are read at
+# startup. Older months are read on demand, newest first, when a lookup
+# misses, so the loaded months are always a contiguous recent range. save()
+# rewrites only the partitions changed since the last save.
+SHARD_FORMAT_VERSION = 1
+SHARD_BASE = "base"
+SHARD_UNBILLED = "unbilled"
+
+def _month_key(date: datetime.date):
+    return f"{date.year:04d}-{date.month:02d}"
+
+class ShardedStore(JsonStore):
+    def __init__(self, store_dir: str = "store_shards", hot_months: int = 3, lazy_bills: bool = False):
+        super().__init__(os.path.join(store_dir, "manifest.json"), os.path.join(store_dir, "journal.jsonl"),
+                         lazy_bills=lazy_bills)
+        self.store_dir = store_dir
+        self.hot_months = hot_months
+        self._partitions = {}  # month key -> manifest entry, for partitions on disk
+        self._loaded = set()  # Partition keys read into memory
+        self._dirty = set()  # Partition keys (and SHARD_BASE) changed since the last save
+        self._orders = {}  # order_id -> Purchase for every loaded order, open or not
+        self._deleted_orders = set()  # Orders deleted while some older partition was still on disk only
+        self._loading = False  # Set while reading files, whose records are not changes
+        self._load_lock = threading.RLock()  # Serializes on-demand loads between concurrent readers
+
+    def _partition_file(self, key: str):
+        return os.path.join(self.store_dir, f"{key}.json")
+
+    def _bill_month(self, bill):
+        if type(bill) is tuple:
+            return _month_key(bill[2])
+        return _month_key(bill.delivery.delivery_date)
+
+    def _home(self, order_id: str):
+        # Partition listing an open purchase: the month of its newest bill
+        bill_ids = self._bills_by_order.get(order_id)
+        if not bill_ids:
+            return SHARD_UNBILLED
+        return max(self._bill_month(self._bills[bill_id]) for bill_id in bill_ids)
+
+    def _touch(self, key: str):
+        # Called before changing a partition, so its stored records are in
+        # memory and the rewrite at the next save does not drop them
+        if not self._loading:
+            self._load_through(key)
+            self._dirty.add(key)
+
+    # Change tracking, hooked into the JsonStore index maintenance that both
+    # live mutations and journal replay go through
+    def _register_client(self, client: Client):
+        self._touch(SHARD_BASE)
+        return super()._register_client(client)
+
+    def _register_item(self, item: Inventory):
+        self._touch(SHARD_BASE)
+        return super()._register_item(item)
+
+    def _set_item_cost(self, item: Inventory, cost: float):
+        self._touch(SHARD_BASE)
+        super()._set_item_cost(item, cost)
+
+    def _register_purchase(self, purchase: Purchase):
+        self._orders[purchase.order_id] = purchase
+        self._touch(self._home(purchase.order_id))
+        return super()._register_purchase(purchase)
+
+    def _register_bill(self, bill: Bill):
+        order_id = bill.delivery.purchase.order_id
+        self._orders.setdefault(order_id, bill.delivery.purchase)
+        if order_id in self._purchases:
+            self._touch(self._home(order_id))  # The purchase may move to the new bill's month
+        self._touch(_month_key(bill.delivery.delivery_date))
+        return super()._register_bill(bill)
+
+    def _remove_purchase(self, purchase: Purchase):
+        order_id = purchase.order_id
+        self._touch(self._home(order_id))
+        for bill_id in self._bills_by_order.get(order_id, ()):
+            self._touch(self._bill_month(self._bills[bill_id]))
+        if any(key not in self._loaded for key in self._partitions):
+            # Older months still on disk may hold bills for this order
+            self._deleted_orders.add(order_id)
+        super()._remove_purchase(purchase)
+        del self._orders[order_id]
+
+    def update_delivery_charges(self, bills):
+        for bill in bills:
+            self._touch(_month_key(bill.delivery.delivery_date))
+        super().update_delivery_charges(bills)
+
+    def _apply_journal_record(self, record):
+        op = record["op"]
+        if op in ("generate_bill", "delete_order"):
+            self._find(lambda: record["order_id"] in self._purchases)
+        elif op == "apply_shipping":
+            self._find(lambda: record["bill_id"] in self._bills)
+            self._touch(self._bill_month(self._bills[record["bill_id"]]))
+        super()._apply_journal_record(record)
+
+    # Loading
+    def _load_partition(self, key: str):
+        self._loaded.add(key)
+        try:
+            with open(self._partition_file(key), "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        self._loading = True
+        try:
+            for record in data["orders"]:
+                if record["order_id"] not in self._orders:
+                    self._orders[record["order_id"]] = Purchase(
+                        self._clients[record["client"]], self._items[record["item"]], record["order_id"])
+            for order_id in data["purchases"]:
+                self._register_purchase(self._orders[order_id])
+            for record in data["bills"]:
+                if record["order_id"] in self._deleted_orders:
+                    self._dirty.add(key)  # Rewrite this month without the deleted order's bills
+                    continue
+                self._register_loaded_bill(record["bill_id"], self._orders[record["order_id"]],
+                                           self._items[record["item"]], record["delivery_date"],
+                                           record["delivery_charge"])
+        finally:
+            self._loading = False
+
+    def _load_through(self, key: str):
+        # Load every stored month from the newest down to key
+        with self._load_lock:
+            for month in sorted(self._partitions, reverse=True):
+                if month < key:
+                    break
+                if month not in self._loaded:
+                    self._load_partition(month)
+
+    def _find(self, found):
+        # Load older months one at a time until found() holds or none are left
+        if found():
+            return True
+        with self._load_lock:
+            for month in sorted(self._partitions, reverse=True):
+                if month not in self._loaded:
+                    self._load_partition(month)
+                    if found():
+                        return True
+        return found()
+
+    def load(self):
+        os.makedirs(self.store_dir, exist_ok=True)  # The journal lives there from the first change
+        try:
+            with open(self.data_file, "r") as f:
+                manifest = json.load(f)
+            with open(self._partition_file(SHARD_BASE), "r") as f:
+                base = json.load(f)
+        except FileNotFoundError:
+            manifest = None
+        if manifest is not None:
+            self._journal_seq = manifest["journal_seq"]
+            self._partitions = manifest["partitions"]
+            self._deleted_orders = set(manifest["deleted_orders"])
+            self._loading = True
+            try:
+                for record in base["clients"]:
+                    self._intern_client(record)
+                for record in base["items"]:
+                    self._intern_item(record)
+            finally:
+                self._loading = False
+            hot = sorted(self._partitions, reverse=True)[:self.hot_months]
+            if hot:
+                self._load_through(hot[-1])
+            self._load_partition(SHARD_UNBILLED)
+        self._loaded.add(SHARD_UNBILLED)
+        self.replay_journal()  # Re-apply changes made since the last save
+
+    # Lookups that miss fall through to the months still on disk
+    def get_purchase(self, order_id: str):
+        self._find(lambda: order_id in self._purchases)
+        return super().get_purchase(order_id)
+
+    def find_purchase_by_title(self, title: str):
+        self._find(lambda: title.lower() in self._purchases_by_title)
+        return super().find_purchase_by_title(title)
+
+    def get_bill(self, bill_id: str):
+        self._find(lambda: bill_id in self._bills)
+        return super().get_bill(bill_id)
+
+    # Whole-collection reads load every month they cover. Months arrive out of
+    # order, so bills are sorted by delivery date rather than insertion.
+    @property
+    def purchases(self):
+        with self._load_lock:
+            self._load_through("")
+            return list(self._purchases.values())
+
+    @property
+    def bills(self):
+        with self._load_lock:
+            self._load_through("")
+            return self._sorted_bills(self._bills)
+
+    def bills_since(self, day: datetime.date):
+        with self._load_lock:
+            self._load_through(_month_key(day))
+            return self._sorted_bills(bill_id for bill_id, bill in self._bills.items()
+                                      if (bill[2] if type(bill) is tuple else bill.delivery.delivery_date) >= day)
+
+    def _sorted_bills(self, bill_ids):
+        bills = [self._bill(bill_id) for bill_id in bill_ids]
+        bills.sort(key=lambda bill: bill.delivery.delivery_date)
+        return bills
+
+    # Persistence
+    def _write_json(self, path: str, data: dict):
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+    def save(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        if SHARD_BASE in self._dirty or not os.path.exists(self._partition_file(SHARD_BASE)):
+            self._write_json(self._partition_file(SHARD_BASE), {
+                "version": SHARD_FORMAT_VERSION,
+                "clients": [{"full_name": c.full_name, "contact": c.contact, "email_address": c.email_address}
+                            for c in self._clients],
+                "items": [{"title": i.title, "writer": i.writer, "cost": i.cost} for i in self._items],
+            })
+
+        dirty = self._dirty - {SHARD_BASE}
+        partitions = {key: {"orders": {}, "purchases": [], "bills": []} for key in dirty}
+
+        def order_ref(partition, purchase):
+            if purchase.order_id not in partition["orders"]:
+                partition["orders"][purchase.order_id] = {
+                    "order_id": purchase.order_id,
+                    "client": self._client_ids[id(purchase.client)],
+                    "item": self._item_ids[id(purchase.inventory)],
+                }
+            return purchase.order_id
+
+        for bill_id, bill in self._bills.items():
+            partition = partitions.get(self._bill_month(bill))
+            if partition is None:
+                continue
+            if type(bill) is tuple:
+                purchase, item, delivery_date, delivery_charge = bill
+            else:
+                purchase, item = bill.delivery.purchase, bill.inventory
+                delivery_date, delivery_charge = bill.delivery.delivery_date, bill.delivery.delivery_charge
+            partition["bills"].append({
+                "bill_id": bill_id,
+                "order_id": order_ref(partition, purchase),
+                "item": self._item_ids[id(item)],
+                "delivery_date": delivery_date.isoformat(),
+                "delivery_charge": delivery_charge,
+            })
+        for order_id, purchase in self._purchases.items():
+            partition = partitions.get(self._home(order_id))
+            if partition is not None:
+                partition["purchases"].append(order_ref(partition, purchase))
+
+        for key, partition in partitions.items():
+            if not partition["bills"] and not partition["purchases"]:
+                if os.path.exists(self._partition_file(key)):
+                    os.remove(self._partition_file(key))
+                self._partitions.pop(key, None)
+                continue
+            self._write_json(self._partition_file(key), {
+                "version": SHARD_FORMAT_VERSION,
+                "month": key,
+                "orders": list(partition["orders"].values()),
+                "purchases": partition["purchases"],
+                "bills": partition["bills"],
+            })
+            if key != SHARD_UNBILLED:
+                self._partitions[key] = {"bills": len(partition["bills"]), "purchases": len(partition["purchases"])}
+
+        if all(key in self._loaded for key in self._partitions):
+            self._deleted_orders.clear()  # Every month on disk has now been rewritten without them
+        # The manifest goes last: until it is replaced, the old one and the
+        # journal still describe a consistent store
+        self._write_json(self.data_file, {
+            "version": SHARD_FORMAT_VERSION,
+            "journal_seq": self._journal_seq,
+            "partitions": dict(sorted(self._partitions.items())),
+            "deleted_orders": sorted(self._deleted_orders),
+        })
+        self._dirty.clear()
+        self.journal.reset()
+
+    def stored_bytes(self):
+        try:
+            names = os.listdir(self.store_dir)
+        except FileNotFoundError:
+            return 0
+        return _file_sizes(*(os.path.join(self.store_dir, name) for name in names))
+
+# SQLite backend: rows stay on disk and are only turned into objects when a
+# lookup asks for them, so opening a store does not depend on its size.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    contact TEXT NOT NULL,
+    email_address TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clients_full_name ON clients (full_name);
+
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    writer TEXT NOT NULL,
+    cost REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_title ON items (title);
+CREATE INDEX IF NOT EXISTS items_title_nocase ON items (title COLLATE NOCASE);
+
+-- Every order a bill or purchase refers to; is_open marks the ones still
+-- listed as purchases.
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    client_id INTEGER NOT NULL REFERENCES clients (id),
+    item_id INTEGER NOT NULL REFERENCES items (id),
+    is_open INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS orders_item ON orders (item_id);
+
+CREATE TABLE IF NOT EXISTS bills (
+    bill_id TEXT PRIMARY KEY,
+    order_id TEXT NOT NULL REFERENCES orders (order_id),
+    item_id INTEGER NOT NULL REFERENCES items (id),
+    delivery_date TEXT NOT NULL,
+    delivery_charge REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bills_order ON bills (order_id);
+CREATE INDEX IF NOT EXISTS bills_delivery_date ON bills (delivery_date);
+"""
+
+ORDER_COLUMNS = """
+    o.order_id, o.item_id, c.full_name, c.contact, c.email_address, i.title, i.writer, i.cost
+"""
+ORDER_JOINS = """
+    JOIN clients c ON c.id = o.client_id
+    JOIN items i ON i.id = o.item_id
+"""
+
+SQLITE_BATCH_SIZE = 500  # IDs per IN (...) query, well under SQLite's variable limit
+LIKE_SPECIAL = re.compile(r"[\\%_]")  # Escaped so filter text matches literally
+
+class SQLiteStore(StoreBackend):
+    def __init__(self, db_file: str = "store_data.db"):
+        self.db_file = db_file
+        self.conn = None
+
+    def load(self):
+        # Shared between threads by BookstoreManager, which serializes writes
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def save(self):
+        self.conn.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def stored_bytes(self):
+        return _file_sizes(self.db_file, self.db_file + "-wal")
+
+    # Row -> object helpers
+    def _purchase_from_row(self, row):
+        order_id, _, full_name, contact, email_address, title, writer, cost = row
+        return Purchase(Client(full_name, contact, email_address), Inventory(title, writer, cost), order_id)
+
+    def _bill_from_row(self, row):
+        bill_id, bill_item_id, delivery_date, delivery_charge = row[:4]
+        purchase = self._purchase_from_row(row[4:])
+        item = purchase.inventory
+        if bill_item_id != row[5]:
+            title, writer, cost = self.conn.execute(
+                "SELECT title, writer, cost FROM items WHERE id = ?", (bill_item_id,)).fetchone()
+            item = Inventory(title, writer, cost)
+        delivery = Delivery(purchase, datetime.date.fromisoformat(delivery_date))
+        delivery.update_delivery_charge(delivery_charge)
+        return Bill(bill_id, item, delivery)
+
+    def _bill_query(self, where: str = ""):
+        return f"""
+            SELECT b.bill_id, b.item_id, b.delivery_date, b.delivery_charge, {ORDER_COLUMNS}
+            FROM bills b
+            JOIN orders o ON o.order_id = b.order_id
+            {ORDER_JOINS}
+            {where}
+        """
+
+    def _client_id(self, client: Client):
+        row = self.conn.execute(
+            "SELECT id FROM clients WHERE full_name = ? AND contact = ? AND email_address = ? LIMIT 1",
+            (client.full_name, client.contact, client.email_address)).fetchone()
+        if row:
+            return row[0]
+        return self.conn.execute(
+            "INSERT INTO clients (full_name, contact, email_address) VALUES (?, ?, ?)",
+            (client.full_name, client.contact, client.email_address)).lastrowid
+
+    def _item_id(self, item: Inventory):
+        row = self.conn.execute(
+            "SELECT id FROM items WHERE title = ? AND writer = ? AND cost = ? LIMIT 1",
+            (item.title, item.writer, item.cost)).fetchone()
+        if row:
+            return row[0]
+        return self.conn.execute(
+            "INSERT INTO items (title, writer, cost) VALUES (?, ?, ?)",
+            (item.title, item.writer, item.cost)).lastrowid
+
+    # Listings are full scans and only meant for reports and exports
+    @property
+    def clients(self):
+        rows = self.conn.execute("SELECT full_name, contact, email_address FROM clients ORDER BY id")
+        return [Client(*row) for row in rows]
+
+    @property
+    def items(self):
+        rows = self.conn.execute("SELECT title, writer, cost FROM items ORDER BY id")
+        return [Inventory(*row) for row in rows]
+
+    @property
+    def purchases(self):
+        rows = self.conn.execute(
+            f"SELECT {ORDER_COLUMNS} FROM orders o {ORDER_JOINS} WHERE o.is_open = 1 ORDER BY o.rowid")
+        return [self._purchase_from_row(row) for row in rows]
+
+    @property
+    def bills(self):
+        rows = self.conn.execute(self._bill_query("ORDER BY b.rowid")).fetchall()
+        return [self._bill_from_row(row) for row in rows]
+
+    # Mutations, committed one at a time
+    def add_client(self, client: Client):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO clients (full_name, contact, email_address) VALUES (?, ?, ?)",
+                (client.full_name, client.contact, client.email_address))
+        return client
+
+    def add_item(self, item: Inventory):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO items (title, writer, cost) VALUES (?, ?, ?)",
+                (item.title, item.writer, item.cost))
+        return item
+
+    def add_clients(self, clients):
+        clients = list(clients)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO clients (full_name, contact, email_address) VALUES (?, ?, ?)",
+                [(client.full_name, client.contact, client.email_address) for client in clients])
+        return clients
+
+    def add_items(self, items):
+        items = list(items)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO items (title, writer, cost) VALUES (?, ?, ?)",
+                [(item.title, item.writer, item.cost) for item in items])
+        return items
+
+    def add_purchase(self, purchase: Purchase):
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO orders (order_id, client_id, item_id, is_open) VALUES (?, ?, ?, 1)
+                   ON CONFLICT (order_id) DO UPDATE SET is_open = 1""",
+                (purchase.order_id, self._client_id(purchase.client), self._item_id(purchase.inventory)))
+        return purchase
+
+    def add_bill(self, bill: Bill):
+        with self.conn:
+            self._insert_bill(bill)
+        return bill
+
+    def add_bills(self, bills):
+        with self.conn:  # One transaction for the whole batch
+            for bill in bills:
+                self._insert_bill(bill)
+
+    def _insert_bill(self, bill: Bill):
+        purchase = bill.delivery.purchase
+        # Bills may refer to an order that is no longer an open purchase
+        self.conn.execute(
+            "INSERT OR IGNORE INTO orders (order_id, client_id, item_id, is_open) VALUES (?, ?, ?, 0)",
+            (purchase.order_id, self._client_id(purchase.client), self._item_id(purchase.inventory)))
+        self.conn.execute(
+            """INSERT INTO bills (bill_id, order_id, item_id, delivery_date, delivery_charge)
+               VALUES (?, ?, ?, ?, ?)""",
+            (bill.bill_id, purchase.order_id, self._item_id(bill.inventory),
+             bill.delivery.delivery_date.isoformat(), bill.delivery.delivery_charge))
+
+    def update_delivery_charge(self, bill: Bill):
+        self.update_delivery_charges([bill])
+
+    def update_delivery_charges(self, bills):
+        with self.conn:
+            self.conn.executemany("UPDATE bills SET delivery_charge = ? WHERE bill_id = ?",
+                                  [(bill.delivery.delivery_charge, bill.bill_id) for bill in bills])
+
+    def update_item_cost(self, item: Inventory, cost: float):
+        with self.conn:
+            # Only the first matching row, the one find_item returned; others may share its old cost
+            self.conn.execute("UPDATE items SET cost = ? WHERE id = (SELECT id FROM items WHERE title = ? AND writer = ?"
+                              " AND cost = ? ORDER BY id LIMIT 1)", (cost, item.title, item.writer, item.cost))
+        item.cost = cost
+        return item
+
+    def remove_purchase(self, purchase: Purchase):
+        with self.conn:
+            self.conn.execute("DELETE FROM bills WHERE order_id = ?", (purchase.order_id,))
+            self.conn.execute("DELETE FROM orders WHERE order_id = ?", (purchase.order_id,))
+
+    # Lookups, each answered from an index
+    def find_client(self, full_name: str):
+        row = self.conn.execute(
+            "SELECT full_name, contact, email_address FROM clients WHERE full_name = ? ORDER BY id LIMIT 1",
+            (full_name,)).fetchone()
+        return Client(*row) if row else None
+
+    def find_item(self, title: str):
+        row = self.conn.execute(
+            "SELECT title, writer, cost FROM items WHERE title = ? ORDER BY id LIMIT 1",
+            (title,)).fetchone()
+        return Inventory(*row) if row else None
+
+    def get_purchase(self, order_id: str):
+        row = self.conn.execute(
+            f"SELECT {ORDER_COLUMNS} FROM orders o {ORDER_JOINS} WHERE o.order_id = ? AND o.is_open = 1",
+            (order_id,)).fetchone()
+        return self._purchase_from_row(row) if row else None
+
+    def find_purchase_by_title(self, title: str):
+        row = self.conn.execute(
+            f"""SELECT {ORDER_COLUMNS} FROM orders o {ORDER_JOINS}
+                WHERE i.title = ? COLLATE NOCASE AND o.is_open = 1
+                ORDER BY o.rowid LIMIT 1""",
+            (title,)).fetchone()
+        return self._purchase_from_row(row) if row else None
+
+    def get_bill(self, bill_id: str):
+        row = self.conn.execute(self._bill_query("WHERE b.bill_id = ?"), (bill_id,)).fetchone()
+        return self._bill_from_row(row) if row else None
+
+    def bills_since(self, day: datetime.date):
+        rows = self.conn.execute(self._bill_query("WHERE b.delivery_date >= ? ORDER BY b.rowid"),
+                                 (day.isoformat(),)).fetchall()
+        return [self._bill_from_row(row) for row in rows]
+
+    def get_purchases(self, order_ids):
+        found = {}
+        for chunk in _chunks(list(order_ids), SQLITE_BATCH_SIZE):
+            rows = self.conn.execute(
+                f"""SELECT {ORDER_COLUMNS} FROM orders o {ORDER_JOINS}
+                    WHERE o.order_id IN ({",".join("?" * len(chunk))}) AND o.is_open = 1""",
+                chunk)
+            for row in rows:
+                found[row[0]] = self._purchase_from_row(row)
+        return found
+
+    def get_bills(self, bill_ids):
+        found = {}
+        for chunk in _chunks(list(bill_ids), SQLITE_BATCH_SIZE):
+            rows = self.conn.execute(
+                self._bill_query(f"WHERE b.bill_id IN ({','.join('?' * len(chunk))})"), chunk).fetchall()
+            for row in rows:
+                found[row[0]] = self._bill_from_row(row)
+        return found
+
+    def bill_view(self, sort: str = "date", descending: bool = False, field: str = None, text: str = ""):
+        # Sorted and filtered by SQLite; the view holds only bill rowids and
+        # reads each page with one query on the primary key
+        where, params = "", ()
+        text = text.strip()
+        if field is not None and text:
+            column = {"client": "c.full_name", "title": "i.title", "date": "b.delivery_date"}[field]
+            pattern = LIKE_SPECIAL.sub(r"\\\g<0>", text)
+            where = f"WHERE {column} LIKE ? ESCAPE '\\'"
+            params = (f"{pattern}%" if field == "date" else f"%{pattern}%",)
+        order = {"date": "b.delivery_date", "client": "c.full_name COLLATE NOCASE",
+                 "title": "i.title COLLATE NOCASE"}[sort]
+        rowids = [row[0] for row in self.conn.execute(
+            f"""SELECT b.rowid FROM bills b
+                JOIN orders o ON o.order_id = b.order_id
+                JOIN clients c ON c.id = o.client_id
+                JOIN items i ON i.id = b.item_id
+                {where}
+                ORDER BY {order} {"DESC" if descending else "ASC"}, b.rowid""", params)]
+        return BillView(rowids, self._bills_by_rowid)
+
+    def _bills_by_rowid(self, rowids: list):
+        found = {}
+        for chunk in _chunks(rowids, SQLITE_BATCH_SIZE):
+            rows = self.conn.execute(
+                f"""SELECT b.rowid, b.bill_id, b.item_id, b.delivery_date, b.delivery_charge, {ORDER_COLUMNS}
+                    FROM bills b JOIN orders o ON o.order_id = b.order_id {ORDER_JOINS}
+                    WHERE b.rowid IN ({','.join('?' * len(chunk))})""", chunk)
+            for row in rows:
+                found[row[0]] = self._bill_from_row(row[1:])
+        return ordered(rowids, found)
+
+def open_store(path: str = None):
+    # None -> store_data.json, a directory -> ShardedStore, *.json -> JsonStore,
+    # anything else -> SQLite file
+    if path is None:
+        return JsonStore()
+    if os.path.isdir(path) or path.endswith(os.sep):
+        return ShardedStore(path)
+    if path.endswith(".json"):
+        return JsonStore(path, journal_path(path))
+    return SQLiteStore(path)
+
+def journal_path(data_file: str):
+    # The journal kept beside a JSON snapshot: store_data.json -> store_journal.jsonl,
+    # shop.json -> shop_journal.jsonl
+    base = data_file[:-len(".json")]
+    if base.endswith("_data"):
+        base = base[:-len("_data")]
+    return base + "_journal.jsonl"
+
+def _file_sizes(*paths):
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+def _chunks(values: list, size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+# Copy every record from one backend into another, e.g. to move an existing
+# store_data.json into SQLite.
+def copy_store(source: StoreBackend, target: StoreBackend):
+    for client in source.clients:
+        target.add_client(client)
+    for item in source.items:
+        target.add_item(item)
+    for purchase in source.purchases:
+        target.add_purchase(purchase)
+    for bill in source.bills:
+        target.add_bill(bill)
+    target.save()
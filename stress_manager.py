@@ -0,0 +1,183 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from main import BookstoreManager
+from models import Client, Delivery, Inventory, Purchase
+from storage import JsonStore, SQLiteStore
+
+# Stress run for a BookstoreManager shared by many threads.
+#
+#   python stress_manager.py --threads 1 2 4 8 --ops 2000 [--sqlite]
+#
+# Every thread runs a seeded mix of purchases, bills, shipping, deletions,
+# batch calls, lookups, searches and full-collection iteration, keeping its
+# own record of what it did. Afterwards the manager, and a second manager
+# reloaded from disk, must agree with those records exactly. Exits non-zero
+# if any invariant fails.
+
+CLIENTS = 50
+ITEMS = 200
+
+class Worker:
+    def __init__(self, manager: BookstoreManager, seed: int, ops: int):
+        self.manager = manager
+        self.rng = random.Random(seed)
+        self.ops = ops
+        self.orders = set()  # Live order IDs created by this thread
+        self.deleted = set()
+        self.bills = {}  # bill_id -> order_id, for bills of live orders
+        self.charges = {}  # bill_id -> last charge applied
+        self.priority = 0
+        self.errors = []
+
+    def run(self):
+        try:
+            for _ in range(self.ops):
+                self.step()
+        except Exception as e:  # Reported as a failed invariant rather than a dead thread
+            self.errors.append(repr(e))
+
+    def step(self):
+        manager, rng = self.manager, self.rng
+        roll = rng.random()
+        if roll < 0.15 or not self.orders:
+            client = manager.find_client(f"client {rng.randrange(CLIENTS)}")
+            item = manager.find_item(f"book {rng.randrange(ITEMS)}")
+            self.orders.add(manager.add_purchase(Purchase(client, item)).order_id)
+        elif roll < 0.30:
+            order_id = rng.choice(tuple(self.orders))
+            self.bills[manager.generate_bill(order_id).bill_id] = order_id
+        elif roll < 0.35:
+            order_ids = rng.sample(tuple(self.orders), min(5, len(self.orders)))
+            for result in manager.generate_bills(order_ids):
+                self.bills[result["bill_id"]] = result["order_id"]
+        elif roll < 0.45 and self.bills:
+            bill_id = rng.choice(tuple(self.bills))
+            method = rng.choice(("priority", "standard"))
+            if not manager.integrate_shipping(bill_id, method):
+                self.errors.append(f"bill {bill_id} vanished")
+            self.record_charge(bill_id, method)
+        elif roll < 0.48 and self.bills:
+            methods = {bill_id: rng.choice(("priority", "standard")) for bill_id in rng.sample(
+                tuple(self.bills), min(5, len(self.bills)))}
+            manager.apply_shipping_bulk(methods)
+            for bill_id, method in methods.items():
+                self.record_charge(bill_id, method)
+        elif roll < 0.53:
+            order_id = rng.choice(tuple(self.orders))
+            if not manager.delete_order_by_id(order_id):
+                self.errors.append(f"order {order_id} vanished")
+            self.orders.discard(order_id)
+            self.deleted.add(order_id)
+            for bill_id in [bill_id for bill_id, owner in self.bills.items() if owner == order_id]:
+                del self.bills[bill_id]
+                self.charges.pop(bill_id, None)
+        elif roll < 0.80:
+            order_id = rng.choice(tuple(self.orders))
+            if manager.locate_purchase(order_id) is None:
+                self.errors.append(f"order {order_id} not found")
+            if self.bills and manager.locate_bill(rng.choice(tuple(self.bills))) is None:
+                self.errors.append("own bill not found")
+        elif roll < 0.95:
+            manager.search_items(f"book {rng.randrange(ITEMS)}", 5)
+        else:
+            # Iterate whole collections while other threads mutate them
+            sum(bill.delivery.delivery_charge for bill in manager.bills)
+            len(manager.purchases)
+
+    def record_charge(self, bill_id: str, method: str):
+        if method == "priority":
+            self.priority += 1
+            self.charges[bill_id] = Delivery.PRIORITY_CHARGE
+        else:
+            self.charges[bill_id] = Delivery.STANDARD_CHARGE
+
+def check(manager: BookstoreManager, workers: list, label: str, check_counter: bool = True):
+    failures = []
+    orders = set().union(*(worker.orders for worker in workers))
+    bills = {}
+    charges = {}
+    for worker in workers:
+        bills.update(worker.bills)
+        charges.update(worker.charges)
+        failures.extend(f"{label}: {error}" for error in worker.errors)
+
+    stored_orders = {purchase.order_id for purchase in manager.purchases}
+    if stored_orders != orders:
+        failures.append(f"{label}: {len(stored_orders)} orders stored, {len(orders)} expected")
+    stored_bills = {bill.bill_id: bill for bill in manager.bills}
+    if set(stored_bills) != set(bills):
+        failures.append(f"{label}: {len(stored_bills)} bills stored, {len(bills)} expected")
+    for bill_id, bill in stored_bills.items():
+        if bill.delivery.purchase.order_id not in stored_orders:
+            failures.append(f"{label}: bill {bill_id} outlived its order")
+        if bill.delivery.delivery_charge != charges.get(bill_id, 0.0):
+            failures.append(f"{label}: bill {bill_id} has charge {bill.delivery.delivery_charge}")
+    expected_priority = sum(worker.priority for worker in workers)
+    if check_counter and manager.urgent_shipments.value != expected_priority:
+        failures.append(f"{label}: urgent_shipments {manager.urgent_shipments.value}, expected {expected_priority}")
+    return failures
+
+def run(threads: int, ops: int, workdir: str, sqlite: bool):
+    def make_store():
+        if sqlite:
+            return SQLiteStore(os.path.join(workdir, "stress.db"))
+        return JsonStore(os.path.join(workdir, "stress.json"), os.path.join(workdir, "stress_journal.jsonl"))
+
+    manager = BookstoreManager(make_store())
+    for i in range(CLIENTS):
+        manager.add_client(Client(f"client {i}", f"{i:010d}", f"client{i}@example.com"))
+    for i in range(ITEMS):
+        manager.add_inventory(Inventory(f"book {i}", f"writer {i % 20}", 10.0 + i % 50))
+
+    workers = [Worker(manager, seed, ops) for seed in range(threads)]
+    pool = [threading.Thread(target=worker.run) for worker in workers]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    failures = check(manager, workers, "live")
+    manager.close()
+    reloaded = BookstoreManager(make_store())
+    failures += check(reloaded, workers, "reloaded", check_counter=False)
+    reloaded.close()
+    return threads * ops / elapsed, failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent stress run for BookstoreManager")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=2000, help="operations per thread")
+    parser.add_argument("--sqlite", action="store_true", help="use SQLiteStore instead of JsonStore")
+    args = parser.parse_args(argv)
+
+    # The manager reports every lookup on stdout; keep only the summary
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    results = []
+    try:
+        for threads in args.threads:
+            with tempfile.TemporaryDirectory() as tmp:
+                results.append((threads, *run(threads, args.ops, tmp, args.sqlite)))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print(f"{'threads':>8}{'ops/s':>12}{'scaling':>10}  invariants")
+    base = results[0][1]
+    failed = False
+    for threads, rate, failures in results:
+        print(f"{threads:>8}{rate:>12.0f}{rate / base:>10.2f}  {'ok' if not failures else f'{len(failures)} FAILED'}")
+        for failure in failures[:10]:
+            print(f"          {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
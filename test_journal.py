@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from models import Client
+from storage import Journal, JsonStore
+
+# Crash recovery for the store journal.
+#
+#   python -m pytest -q test_journal.py
+
+class JournalCrashTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp.name, "store_data.json")
+        self.journal_file = os.path.join(self.tmp.name, "store_journal.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_store(self):
+        store = JsonStore(self.data_file, self.journal_file)
+        store.load()
+        return store
+
+    def add_clients(self, store, *names):
+        for name in names:
+            store.add_client(Client(name, "555 0100", f"{name}@example.com"))
+
+    def test_appends_after_torn_record_survive_restart(self):
+        store = self.open_store()
+        self.add_clients(store, "a")
+        store.close()
+        with open(self.journal_file, "a") as f:
+            f.write('{"op": "add_client", "full_na')  # Crash mid-append
+
+        store = self.open_store()
+        self.add_clients(store, "b", "c")
+        store.close()
+
+        store = self.open_store()
+        self.assertEqual([client.full_name for client in store.clients], ["a", "b", "c"])
+        store.close()
+
+    def test_record_missing_its_newline_is_kept(self):
+        store = self.open_store()
+        self.add_clients(store, "a")
+        store.close()
+        with open(self.journal_file, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            f.truncate()  # Crash between the record and its newline
+
+        store = self.open_store()
+        self.add_clients(store, "b")
+        store.close()
+
+        store = self.open_store()
+        self.assertEqual([client.full_name for client in store.clients], ["a", "b"])
+        store.close()
+
+    def test_replay_leaves_file_alone_until_next_append(self):
+        with open(self.journal_file, "w") as f:
+            f.write('{"seq": 1}\n{"seq": 2}\n{"seq"')
+        journal = Journal(self.journal_file)
+        self.assertEqual([record["seq"] for record in journal.replay()], [1, 2])
+        with open(self.journal_file) as f:
+            self.assertEqual(f.read(), '{"seq": 1}\n{"seq": 2}\n{"seq"')  # Read-only tools change nothing
+        journal.append({"seq": 3})
+        journal.close()
+        with open(self.journal_file) as f:
+            self.assertEqual(f.read(), '{"seq": 1}\n{"seq": 2}\n{"seq": 3}\n')
+
+    def test_unreadable_line_before_the_end_is_skipped_not_cut(self):
+        with open(self.journal_file, "w") as f:
+            f.write('{"seq": 1}\ngarbage\n{"seq": 3}\n')
+        journal = Journal(self.journal_file)
+        self.assertEqual([record["seq"] for record in journal.replay()], [1, 3])
+        journal.append({"seq": 4})
+        journal.close()
+        with open(self.journal_file) as f:
+            self.assertEqual(f.read(), '{"seq": 1}\ngarbage\n{"seq": 3}\n{"seq": 4}\n')
+
+    def test_loads_with_devnull_journal(self):
+        store = JsonStore(self.data_file, os.devnull)
+        store.load()
+        self.add_clients(store, "a")
+        store.save()
+        store.close()
+
+        store = JsonStore(self.data_file, os.devnull)
+        store.load()
+        self.assertEqual([client.full_name for client in store.clients], ["a"])
+        store.close()
+
+if __name__ == "__main__":
+    unittest.main()
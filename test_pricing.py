@@ -0,0 +1,96 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from main import BookstoreManager
+from models import Client, Inventory, Purchase
+from storage import JsonStore, SQLiteStore
+
+# Cached bill totals and aggregates staying current through cost and shipping
+# changes, for each backend.
+#
+#   python -m pytest -q test_pricing.py
+
+class PricingCacheTest:
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = BookstoreManager(self.make_store())
+        self.client = self.manager.add_client(Client("Ann", "555 0100", "ann@example.com"))
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def bill_for(self, item: Inventory):
+        purchase = self.manager.add_purchase(Purchase(self.client, item))
+        return self.manager.generate_bill(purchase.order_id).bill_id
+
+    def assert_totals_match_store(self):
+        # Every cached figure against one recomputed from the store's bills
+        bills = self.manager.bills
+        for bill in bills:
+            expected = bill.inventory.cost + bill.delivery.delivery_charge
+            self.assertAlmostEqual(self.manager.bill_total(bill.bill_id), expected)
+        self.assertAlmostEqual(self.manager.grand_total(),
+                               sum(bill.inventory.cost + bill.delivery.delivery_charge for bill in bills))
+        self.assertAlmostEqual(self.manager.client_total(self.client), self.manager.grand_total())
+        self.assertAlmostEqual(self.manager.day_total(datetime.date.today()), self.manager.grand_total())
+
+    def test_cost_change_updates_only_the_repriced_items_bills(self):
+        a = self.manager.add_inventory(Inventory("t", "w", 10.0))
+        b = self.manager.add_inventory(Inventory("t", "w", 12.0))
+        bill_a, bill_b = self.bill_for(a), self.bill_for(b)
+        self.manager.grand_total()  # Build the aggregates and search index before the changes
+        self.manager.search_items("t")
+
+        self.manager.update_inventory_cost("t", 12.0)  # a now shares b's key
+        self.manager.update_inventory_cost("t", 15.0)  # and must move away from it alone
+
+        self.assertEqual(sorted(item.cost for item in self.manager.items), [12.0, 15.0])
+        self.assertAlmostEqual(self.manager.bill_total(bill_a), 15.0)
+        self.assertAlmostEqual(self.manager.bill_total(bill_b), 12.0)
+        self.assert_totals_match_store()
+        self.assertEqual(sorted(item.cost for item in self.manager.search_items("t")), [12.0, 15.0])
+
+    def test_cost_change_reaches_the_search_index(self):
+        self.manager.add_inventory(Inventory("Dune", "Herbert", 5.0))
+        self.manager.search_items("du")  # Build the index first
+        self.manager.update_inventory_cost("Dune", 7.0)
+        self.assertEqual([item.cost for item in self.manager.search_items("du")], [7.0])
+        self.assertEqual(self.manager.resolve_item("dune").cost, 7.0)
+
+    def test_shipping_change_updates_cached_totals(self):
+        item = self.manager.add_inventory(Inventory("Dune", "Herbert", 20.0))
+        first, second = self.bill_for(item), self.bill_for(item)
+        self.manager.bill_total(first)  # Cached before the change
+        self.manager.grand_total()
+
+        self.manager.integrate_shipping(first, "priority")
+        self.manager.apply_shipping_bulk({second: "standard"})
+
+        table = self.manager.pricing.table
+        self.assertAlmostEqual(self.manager.bill_total(first), 20.0 + table.charge("priority"))
+        self.assertAlmostEqual(self.manager.bill_total(second), 20.0 + table.charge("standard"))
+        self.assert_totals_match_store()
+
+    def test_deleted_order_leaves_the_totals(self):
+        item = self.manager.add_inventory(Inventory("Dune", "Herbert", 20.0))
+        kept, dropped = self.bill_for(item), self.bill_for(item)
+        self.manager.grand_total()
+        self.manager.delete_order_by_id(self.manager.store.get_bill(dropped).delivery.purchase.order_id)
+        self.assertIsNone(self.manager.bill_total(dropped))
+        self.assertAlmostEqual(self.manager.grand_total(), self.manager.bill_total(kept))
+        self.assert_totals_match_store()
+
+class JsonStorePricingTest(PricingCacheTest, unittest.TestCase):
+    def make_store(self):
+        return JsonStore(os.path.join(self.tmp.name, "store_data.json"),
+                         os.path.join(self.tmp.name, "store_journal.jsonl"))
+
+class SQLiteStorePricingTest(PricingCacheTest, unittest.TestCase):
+    def make_store(self):
+        return SQLiteStore(os.path.join(self.tmp.name, "store.db"))
+
+if __name__ == "__main__":
+    unittest.main()
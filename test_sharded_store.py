@@ -0,0 +1,145 @@
+import datetime
+import json
+import os
+import tempfile
+import unittest
+
+from models import Bill, Client, Delivery, Inventory, Purchase
+from storage import JsonStore, ShardedStore, SQLiteStore, open_store
+
+# Month partitions of the sharded store across deletes, restarts and saves.
+#
+#   python -m pytest -q test_sharded_store.py
+
+class ShardedStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.tmp.name, "shards")
+        store = self.open_store()
+        store.add_client(Client("Ann", "555 0100", "ann@example.com"))
+        store.add_item(Inventory("Dune", "Herbert", 20.0))
+        store.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_store(self):
+        store = ShardedStore(self.store_dir, hot_months=1)
+        store.load()
+        return store
+
+    def order(self, store, *months):
+        # An open purchase with one bill per "YYYY-MM" month given
+        purchase = store.add_purchase(Purchase(store.find_client("Ann"), store.find_item("Dune")))
+        for month in months:
+            year, month = map(int, month.split("-"))
+            delivery = Delivery(purchase, datetime.date(year, month, 15))
+            store.add_bill(Bill(f"{purchase.order_id}-{year}-{month}", purchase.inventory, delivery))
+        return purchase.order_id
+
+    def read(self, name):
+        with open(os.path.join(self.store_dir, f"{name}.json")) as f:
+            return json.load(f)
+
+    def partition_orders(self, name):
+        partition = self.read(name)
+        return ({bill["order_id"] for bill in partition["bills"]}, set(partition["purchases"]))
+
+    def test_delete_in_cold_month_survives_restart_from_journal_and_save(self):
+        store = self.open_store()
+        oldest = self.order(store, "2023-11")
+        kept = self.order(store, "2024-01")
+        deleted = self.order(store, "2024-01", "2024-03")
+        newest = self.order(store, "2024-06")
+        store.save()
+        store.close()
+
+        store = self.open_store()  # Only 2024-06 is loaded
+        store.remove_purchase(store.get_purchase(deleted))
+        store.close()  # The delete is in the journal only
+
+        store = self.open_store()
+        store.save()
+        store.close()
+        manifest = self.read("manifest")
+        self.assertEqual(sorted(manifest["partitions"]), ["2023-11", "2024-01", "2024-06"])
+        self.assertEqual(manifest["deleted_orders"], [deleted])  # 2023-11 was never read
+        self.assertFalse(os.path.exists(os.path.join(self.store_dir, "2024-03.json")))
+        # 2024-01 was not read either, so it keeps the bill until it is; the
+        # manifest's deleted_orders hides it meanwhile
+        self.assertEqual(self.partition_orders("2024-01"), ({kept, deleted}, {kept}))
+        self.assertEqual(self.partition_orders("2023-11"), ({oldest}, {oldest}))
+        self.assertEqual(os.path.getsize(os.path.join(self.store_dir, "journal.jsonl")), 0)
+
+        store = self.open_store()
+        self.assertIsNone(store.get_purchase(deleted))
+        self.assertIsNone(store.get_bill(f"{deleted}-2024-1"))
+        self.assertEqual(sorted(purchase.order_id for purchase in store.purchases),
+                         sorted([oldest, kept, newest]))
+        self.assertEqual(len(store.bills), 3)
+        store.save()  # Every month has now been read, and 2024-01 rewritten
+        store.close()
+        self.assertEqual(self.read("manifest")["deleted_orders"], [])
+        self.assertEqual(self.partition_orders("2024-01"), ({kept}, {kept}))
+
+    def test_purchase_moves_to_the_month_of_its_newest_bill(self):
+        store = self.open_store()
+        self.order(store, "2024-06")
+        moving = self.order(store)
+        store.save()
+        store.close()
+        self.assertEqual(self.partition_orders("unbilled"), (set(), {moving}))
+
+        store = self.open_store()
+        purchase = store.get_purchase(moving)
+        store.add_bill(Bill("b1", purchase.inventory, Delivery(purchase, datetime.date(2024, 2, 1))))
+        store.save()
+        store.close()
+        self.assertFalse(os.path.exists(os.path.join(self.store_dir, "unbilled.json")))
+        self.assertEqual(self.partition_orders("2024-02"), ({moving}, {moving}))
+
+        store = self.open_store()  # 2024-02 is cold now
+        purchase = store.get_purchase(moving)
+        store.add_bill(Bill("b2", purchase.inventory, Delivery(purchase, datetime.date(2024, 7, 1))))
+        store.close()
+
+        store = self.open_store()  # Replays the second bill from the journal
+        store.save()
+        store.close()
+        self.assertEqual(self.partition_orders("2024-02"), ({moving}, set()))
+        self.assertEqual(self.partition_orders("2024-07"), ({moving}, {moving}))
+
+        store = self.open_store()
+        self.assertEqual([p.order_id for p in store.purchases].count(moving), 1)
+        self.assertEqual(len(store.bills), 3)
+        store.close()
+
+    def test_base_and_unbilled_changes_read_no_months(self):
+        store = self.open_store()
+        for month in ("2024-01", "2024-02", "2024-03"):
+            self.order(store, month)
+        store.save()
+        store.close()
+
+        store = self.open_store()
+        loaded = set(store._loaded)  # base and unbilled sort after every month key
+        store.add_client(Client("Bob", "555 0101", "bob@example.com"))
+        store.add_item(Inventory("Emma", "Austen", 9.0))
+        self.order(store)
+        self.assertEqual(store._loaded, loaded)
+        store.close()
+
+class OpenStoreTest(unittest.TestCase):
+    def test_paths_pick_the_backend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsInstance(open_store(tmp), ShardedStore)
+            store = open_store(os.path.join(tmp, "shop.json"))
+            self.assertIs(type(store), JsonStore)
+            self.assertEqual(store.journal.path, os.path.join(tmp, "shop_journal.jsonl"))
+            self.assertEqual(open_store("store_data.json").journal.path, "store_journal.jsonl")
+            store = open_store(os.path.join(tmp, "store.db"))
+            self.assertIsInstance(store, SQLiteStore)
+            store.close()
+
+if __name__ == "__main__":
+    unittest.main()
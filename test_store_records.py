@@ -0,0 +1,31 @@
+import io
+import json
+import unittest
+
+from storage import iter_store_dict, iter_store_records
+
+# The streaming snapshot parser against json.loads, at every chunk size.
+#
+#   python -m pytest -q test_store_records.py
+
+class StoreRecordsTest(unittest.TestCase):
+    def assert_parses_like_json(self, text: str):
+        expected = list(iter_store_dict(json.loads(text)))
+        for chunk_size in range(1, len(text) + 1):
+            self.assertEqual(list(iter_store_records(io.StringIO(text), chunk_size)), expected, chunk_size)
+
+    def test_numbers_split_at_a_chunk_boundary(self):
+        self.assert_parses_like_json('{"x": [1.5, 22]}')
+        self.assert_parses_like_json('{"x": [-2.25e-7, 3E+12, 0, -0.5, 10], "n": 12.75}')
+
+    def test_records_and_scalars(self):
+        self.assert_parses_like_json(json.dumps({
+            "version": 2,
+            "clients": [{"full_name": "Ann é", "contact": "555 0100", "email_address": "a@example.com"}],
+            "items": [],
+            "bills": [{"bill_id": "b1", "delivery_charge": 4.2, "flags": [True, None]}],
+            "journal_seq": 17,
+        }))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import math
+import re
+
+# Field checks shared by the entry forms and the bulk importer. Each returns
+# the cleaned fields or raises ValueError naming the first problem.
+
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+CONTACT_PATTERN = re.compile(r"[0-9 +()\-.]+")
+MAX_COST = 1000000.0
+
+def _text(value: str, field: str, max_length: int):
+    value = " ".join(value.split())
+    if not value:
+        raise ValueError(f"{field} is empty")
+    if len(value) > max_length:
+        raise ValueError(f"{field} is longer than {max_length} characters")
+    return value
+
+def validate_client(full_name: str, contact: str, email_address: str):
+    full_name = _text(full_name, "full_name", 200)
+    contact = contact.strip()
+    digits = sum(ch.isdigit() for ch in contact)
+    if not CONTACT_PATTERN.fullmatch(contact) or not 7 <= digits <= 15:
+        raise ValueError(f"contact {contact!r} is not a phone number")
+    email_address = email_address.strip()
+    if not EMAIL_PATTERN.fullmatch(email_address):
+        raise ValueError(f"email_address {email_address!r} is not an email address")
+    return full_name, contact, email_address
+
+def validate_item(title: str, writer: str, cost):
+    title = _text(title, "title", 300)
+    writer = _text(writer, "writer", 200)
+    try:
+        cost = float(cost)
+    except (TypeError, ValueError):
+        raise ValueError(f"cost {cost!r} is not a number")
+    if not math.isfinite(cost) or not 0 <= cost <= MAX_COST:
+        raise ValueError(f"cost {cost} is out of range")
+    return title, writer, round(cost, 2)
+
+VALIDATORS = {"clients": validate_client, "inventory": validate_item}
+COLUMNS = {"clients": ("full_name", "contact", "email_address"), "inventory": ("title", "writer", "cost")}
+
+def validate_rows(kind: str, first_row: int, rows: list, positions: tuple):
+    # Process pool entry point. positions are the column indexes of the
+    # fields in COLUMNS[kind] order. Returns (accepted (row number, fields)
+    # pairs, rejected (row number, reason, raw row) triples).
+    validate = VALIDATORS[kind]
+    width = max(positions) + 1
+    accepted, rejected = [], []
+    for number, row in enumerate(rows, first_row):
+        if len(row) < width:
+            rejected.append((number, f"row has {len(row)} columns, expected at least {width}", row))
+            continue
+        try:
+            accepted.append((number, validate(*[row[i] for i in positions])))
+        except ValueError as e:
+            rejected.append((number, str(e), row))
+    return accepted, rejected